@@ -0,0 +1,17 @@
+"""Benchmarks for the site generator.
+
+Run the stage benchmark from the repository root:
+
+    python3 -m bench --pages 500 --save bench/results.json
+    python3 -m bench --pages 500 --baseline bench/results.json
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# the generator's modules import each other as top-level modules
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+from pathlib import Path
+
+from bench.corpus import CorpusSpec, generate_corpus
+from bench.stages import run_stages
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    regressions = []
+    print(f"{'stage':<24} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<24} {'-':>10} {current['min']:>10.4f} {'new':>7}")
+            continue
+        ratio = current["min"] / before["min"] if before["min"] else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  <- slower"
+        print(
+            f"{name:<24} {before['min']:>10.4f} {current['min']:>10.4f} "
+            f"{ratio:>6.2f}x{flag}"
+        )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    spec = CorpusSpec()
+    parser = argparse.ArgumentParser(
+        prog="python3 -m bench", description="Time each build stage."
+    )
+    for name, default in spec.as_dict().items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(default), default=default
+        )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", type=Path, help="write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare against saved results")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="fraction slower than the baseline that counts as a regression",
+    )
+    args = parser.parse_args(argv)
+    spec = CorpusSpec(**{name: getattr(args, name) for name in spec.as_dict()})
+
+    with tempfile.TemporaryDirectory() as td:
+        root = Path(td)
+        content, static, template = generate_corpus(root / "corpus", spec)
+        results = run_stages(content, static, template, root / "work", args.repeat)
+
+    report = {
+        "corpus": spec.as_dict(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "stages": results,
+    }
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("corpus") != report["corpus"]:
+            print("warning: baseline was recorded with a different corpus")
+        regressions = compare(results, baseline["stages"], args.tolerance)
+    else:
+        regressions = []
+        for name, timing in results.items():
+            per_item = timing["min"] / max(timing["items"], 1) * 1e6
+            print(f"{name:<24} {timing['min']:>10.4f}s {per_item:>10.1f} us/item")
+
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
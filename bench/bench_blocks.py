@@ -0,0 +1,92 @@
+"""Compare single-pass block classification against the old per-rule scans.
+
+Run from the repository root:
+
+    python3 bench/bench_blocks.py
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from markdown_handler import BlockType, block_to_block_type  # noqa: E402
+
+
+# --- block_to_block_type before the single-pass rewrite ---
+
+
+def _legacy_is_ordered_list(block):
+    match = re.match(r"^\D+\.*", block)
+    if match:
+        return False
+    num = 1
+    for line in block.split("\n"):
+        try:
+            num_str, _ = line.split(". ", maxsplit=1)
+            if not int(num_str) == num:
+                return False
+        except ValueError:
+            return False
+        num += 1
+    return True
+
+
+def legacy_block_to_block_type(block: str) -> BlockType:
+    if re.match(r"^#{1,6} ", block):
+        return BlockType.HEADING
+    if block.startswith("```\n") and block.endswith("```"):
+        return BlockType.CODE
+    if all(line.startswith(">") for line in block.split("\n")):
+        return BlockType.QUOTE
+    if all(line.startswith("- ") for line in block.split("\n")):
+        return BlockType.UNORDERED_LIST
+    if _legacy_is_ordered_list(block):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+def make_block(block_type: BlockType, lines: int) -> str:
+    match block_type:
+        case BlockType.HEADING:
+            return "## A heading with a few words"
+        case BlockType.CODE:
+            body = "\n".join(f"    line {i}" for i in range(lines))
+            return f"```\n{body}\n```"
+        case BlockType.QUOTE:
+            return "\n".join(f"> quoted line {i}" for i in range(lines))
+        case BlockType.UNORDERED_LIST:
+            return "\n".join(f"- item {i}" for i in range(lines))
+        case BlockType.ORDERED_LIST:
+            return "\n".join(f"{i}. item {i}" for i in range(1, lines + 1))
+        case _:
+            return "\n".join(f"plain words on line {i}" for i in range(lines))
+
+
+def main() -> None:
+    print(
+        f"{'block type':<16} {'lines':>6} {'legacy (us)':>12} "
+        f"{'single (us)':>12} {'speedup':>8}"
+    )
+    for block_type in BlockType:
+        for lines in (5, 50, 500):
+            block = make_block(block_type, lines)
+            assert block_to_block_type(block) == block_type
+            assert legacy_block_to_block_type(block) == block_type
+            number = max(10, 20_000 // lines)
+            legacy = timeit.timeit(
+                lambda: legacy_block_to_block_type(block), number=number
+            )
+            single = timeit.timeit(lambda: block_to_block_type(block), number=number)
+            print(
+                f"{block_type:<16} {lines:>6} {legacy / number * 1e6:>12.2f} "
+                f"{single / number * 1e6:>12.2f} {legacy / single:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
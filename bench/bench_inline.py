@@ -0,0 +1,108 @@
+"""Compare the single-pass inline scanner against the old split_nodes_* chain.
+
+Run from the repository root:
+
+    python3 bench/bench_inline.py
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from markdown_handler import text_to_textnodes  # noqa: E402
+from textnode import TextNode, TextType  # noqa: E402
+
+
+# --- the five-pass chain text_to_textnodes used before the scanner ---
+
+
+def _legacy_split_nodes_delimiter(old_nodes, delimiter, text_type):
+    new_nodes = []
+    for node in old_nodes:
+        if node.text_type != TextType.TEXT.value or delimiter not in node.text:
+            new_nodes.append(node)
+            continue
+        parts = node.text.split(delimiter)
+        if len(parts) % 2 == 0:
+            raise ValueError(f"Invalid markdown: unmatchted delimiter {delimiter!r}")
+        for i, part in enumerate(parts):
+            if part == "":
+                continue
+            new_nodes.append(TextNode(part, TextType.TEXT if i % 2 == 0 else text_type))
+    return new_nodes
+
+
+def _legacy_split_nodes_pattern(old_nodes, pattern, fmt, text_type):
+    new_nodes = []
+    for node in old_nodes:
+        matches = re.findall(pattern, node.text)
+        if not matches:
+            new_nodes.append(node)
+            continue
+        text = node.text
+        for label, url in matches:
+            before, after = text.split(fmt.format(label, url), maxsplit=1)
+            if before:
+                new_nodes.append(TextNode(before, TextType.TEXT))
+            new_nodes.append(TextNode(label, text_type, url))
+            text = after
+        if text:
+            new_nodes.append(TextNode(text, TextType.TEXT))
+    return new_nodes
+
+
+def legacy_text_to_textnodes(text: str) -> list[TextNode]:
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = _legacy_split_nodes_pattern(
+        nodes, r"!\[(.*?)\]\((.*?)\)", "![{}]({})", TextType.IMAGE
+    )
+    nodes = _legacy_split_nodes_pattern(
+        nodes, r"\[(.*?)\]\((.*?)\)", "[{}]({})", TextType.LINK
+    )
+    for delimiter, text_type in [
+        ("`", TextType.CODE),
+        ("**", TextType.BOLD),
+        ("_", TextType.ITALIC),
+    ]:
+        nodes = _legacy_split_nodes_delimiter(nodes, delimiter, text_type)
+    return nodes
+
+
+def make_paragraph(spans: int) -> str:
+    pieces = []
+    for i in range(spans):
+        match i % 5:
+            case 0:
+                pieces.append(f"see [link {i}](https://example.com/{i})")
+            case 1:
+                pieces.append(f"an ![image {i}](/images/{i}.png)")
+            case 2:
+                pieces.append(f"some **bold {i}** words")
+            case 3:
+                pieces.append(f"and _italic {i}_ text")
+            case _:
+                pieces.append(f"with `code {i}` inline")
+    return " ".join(pieces)
+
+
+def main() -> None:
+    print(f"{'spans':>8} {'chain (ms)':>12} {'scanner (ms)':>13} {'speedup':>8}")
+    for spans in (10, 100, 1_000, 5_000):
+        text = make_paragraph(spans)
+        assert legacy_text_to_textnodes(text) == text_to_textnodes(text)
+        number = max(1, 2_000 // spans)
+        legacy = timeit.timeit(lambda: legacy_text_to_textnodes(text), number=number)
+        scanner = timeit.timeit(lambda: text_to_textnodes(text), number=number)
+        print(
+            f"{spans:>8} {legacy / number * 1e3:>12.3f} "
+            f"{scanner / number * 1e3:>13.3f} {legacy / scanner:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
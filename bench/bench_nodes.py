@@ -0,0 +1,95 @@
+"""Measure memory and allocations per node for the slotted node classes.
+
+Run from the repository root:
+
+    python3 bench/bench_nodes.py
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from htmlnode import LeafNode  # noqa: E402
+from textnode import TextNode, TextType  # noqa: E402
+
+
+# --- the dict-backed classes used before __slots__ ---
+
+
+class LegacyHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class LegacyLeafNode(LegacyHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag=tag, value=value, props=props)
+
+
+class LegacyTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type.value
+        self.url = url
+
+
+COUNT = 100_000
+TEXT = "shared span text"
+
+
+def _bytes_per_node(factory: Callable[[], object]) -> tuple[float, int]:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    nodes = [factory() for _ in range(COUNT)]
+    after, _ = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    del nodes
+    # the list itself holds one pointer per node
+    return (after - before) / COUNT - 8, blocks // COUNT
+
+
+def main() -> None:
+    cases: list[tuple[str, Callable[[], object], Callable[[], object]]] = [
+        (
+            "TextNode",
+            lambda: LegacyTextNode(TEXT, TextType.BOLD),
+            lambda: TextNode(TEXT, TextType.BOLD),
+        ),
+        (
+            "LeafNode",
+            lambda: LegacyLeafNode("b", TEXT),
+            lambda: LeafNode("b", TEXT),
+        ),
+    ]
+    print(f"{'class':<10} {'before B/node':>14} {'after B/node':>13} {'allocs':>10}")
+    for name, legacy, current in cases:
+        legacy_bytes, legacy_blocks = _bytes_per_node(legacy)
+        current_bytes, current_blocks = _bytes_per_node(current)
+        print(
+            f"{name:<10} {legacy_bytes:>14.0f} {current_bytes:>13.0f} "
+            f"{legacy_blocks:>4} -> {current_blocks}"
+        )
+
+    print()
+    for name, legacy, current in cases:
+        legacy_time = timeit.timeit(legacy, number=COUNT)
+        current_time = timeit.timeit(current, number=COUNT)
+        print(
+            f"construct {name}: before {legacy_time / COUNT * 1e9:.0f} ns, "
+            f"after {current_time / COUNT * 1e9:.0f} ns"
+        )
+
+
+if __name__ == "__main__":
+    main()
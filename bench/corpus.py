@@ -0,0 +1,113 @@
+"""Reproducible synthetic content trees for benchmarking."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam "
+    "quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+
+@dataclass
+class CorpusSpec:
+    pages: int = 200
+    blocks_per_page: int = 20
+    words_per_block: int = 40
+    # probability that any given word is a link or image
+    link_density: float = 0.05
+    # probability that any given word is bold, italic or inline code
+    emphasis_density: float = 0.1
+    # pages are spread over directories nested up to this deep
+    depth: int = 3
+    static_files: int = 50
+    static_size: int = 16 * 1024
+    seed: int = 0
+
+    def as_dict(self) -> dict[str, float | int]:
+        return asdict(self)
+
+
+def _inline(rng: random.Random, spec: CorpusSpec, words: int) -> str:
+    out = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < spec.link_density:
+            if rng.random() < 0.2:
+                out.append(f"![{word}](/images/{word}.png)")
+            else:
+                out.append(f"[{word}](https://example.com/{word})")
+        elif roll < spec.link_density + spec.emphasis_density:
+            out.append(rng.choice(("**{}**", "_{}_", "`{}`")).format(word))
+        else:
+            out.append(word)
+    return " ".join(out)
+
+
+def _block(rng: random.Random, spec: CorpusSpec) -> str:
+    kind = rng.random()
+    words = spec.words_per_block
+    if kind < 0.1:
+        return "#" * rng.randint(2, 6) + " " + _inline(rng, spec, 6)
+    if kind < 0.2:
+        lines = [" ".join(rng.choices(WORDS, k=6)) for _ in range(words // 6 + 1)]
+        return "```\n" + "\n".join(lines) + "\n```"
+    if kind < 0.3:
+        lines = [_inline(rng, spec, 8) for _ in range(words // 8 + 1)]
+        return "\n".join(f"> {line}" for line in lines)
+    if kind < 0.45:
+        lines = [_inline(rng, spec, 6) for _ in range(words // 6 + 1)]
+        return "\n".join(f"- {line}" for line in lines)
+    if kind < 0.55:
+        lines = [_inline(rng, spec, 6) for _ in range(words // 6 + 1)]
+        return "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+    lines = [_inline(rng, spec, 10) for _ in range(words // 10 + 1)]
+    return "\n".join(lines)
+
+
+def make_page(rng: random.Random, spec: CorpusSpec, index: int) -> str:
+    blocks = [f"# Page {index} {rng.choice(WORDS)}"]
+    blocks.extend(_block(rng, spec) for _ in range(spec.blocks_per_page))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_corpus(root: Path, spec: CorpusSpec) -> tuple[Path, Path, Path]:
+    rng = random.Random(spec.seed)
+    content = root / "content"
+    static = root / "static"
+
+    for i in range(spec.pages):
+        depth = rng.randint(0, spec.depth)
+        parts = [f"section{rng.randrange(4)}" for _ in range(depth)]
+        path = content.joinpath(*parts, f"page{i}.md")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(make_page(rng, spec, i), encoding="utf-8")
+
+    for i in range(spec.static_files):
+        sub = static / ("images" if i % 2 else "fonts")
+        sub.mkdir(parents=True, exist_ok=True)
+        (sub / f"asset{i}.bin").write_bytes(rng.randbytes(spec.static_size))
+    (static / "index.css").write_text("body { margin: 0 }\n", encoding="utf-8")
+
+    template = root / "template.html"
+    template.write_text(TEMPLATE, encoding="utf-8")
+    return content, static, template
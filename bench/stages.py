@@ -0,0 +1,108 @@
+"""Time each build stage separately over a generated corpus."""
+
+from __future__ import annotations
+
+import io
+import shutil
+import statistics
+import time
+from pathlib import Path
+from typing import Callable
+
+from main import generate_pages_recursive
+from markdown_handler import (
+    block_to_block_type,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    parse_document,
+    text_to_textnodes,
+)
+from template import compile_template
+from utils import copy_static
+
+
+def _time(fn: Callable[[], object], repeat: int) -> dict[str, float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {"min": min(runs), "median": statistics.median(runs)}
+
+
+def run_stages(
+    content: Path, static: Path, template_path: Path, work: Path, repeat: int = 5
+) -> dict[str, dict[str, float]]:
+    md_paths = sorted(content.rglob("*.md"))
+    sources = [path.read_text(encoding="utf-8") for path in md_paths]
+    blocks = [block for md in sources for block in markdown_to_blocks(md)]
+    # inline text as the paragraph handler sees it, code blocks excluded
+    inline = [
+        " ".join(line.strip() for line in block.splitlines())
+        for block in blocks
+        if not block.startswith("```")
+    ]
+    trees = [markdown_to_html_node(md) for md in sources]
+    bodies = [tree.to_html() for tree in trees]
+    template = compile_template(template_path.read_text(encoding="utf-8"))
+    out_dir = work / "out"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def read() -> None:
+        for path in md_paths:
+            path.read_text(encoding="utf-8")
+
+    def fill() -> list[str]:
+        pages = []
+        for body in bodies:
+            buf = io.StringIO()
+            template.render(buf, {"Title": "Title", "Content": body})
+            pages.append(buf.getvalue())
+        return pages
+
+    pages = fill()
+
+    def write() -> None:
+        for i, page in enumerate(pages):
+            (out_dir / f"{i}.html").write_text(page, encoding="utf-8")
+
+    def full_build() -> None:
+        shutil.rmtree(work / "public", ignore_errors=True)
+        generate_pages_recursive(content, template_path, work / "public")
+
+    stages: dict[str, tuple[Callable[[], object], int]] = {
+        "read": (read, len(md_paths)),
+        "markdown_to_blocks": (
+            lambda: [markdown_to_blocks(md) for md in sources],
+            len(sources),
+        ),
+        "block_to_block_type": (
+            lambda: [block_to_block_type(block) for block in blocks],
+            len(blocks),
+        ),
+        "text_to_textnodes": (
+            lambda: [text_to_textnodes(text) for text in inline],
+            len(inline),
+        ),
+        "markdown_to_html_node": (
+            lambda: [markdown_to_html_node(md) for md in sources],
+            len(sources),
+        ),
+        "parse_document": (
+            lambda: [parse_document(md) for md in sources],
+            len(sources),
+        ),
+        "to_html": (lambda: [tree.to_html() for tree in trees], len(trees)),
+        "template_fill": (fill, len(bodies)),
+        "write": (write, len(pages)),
+        "copy_static": (
+            lambda: copy_static(str(static), str(work / "static_out")),
+            sum(1 for path in static.rglob("*") if path.is_file()),
+        ),
+        "full_build": (full_build, len(md_paths)),
+    }
+
+    results: dict[str, dict[str, float]] = {}
+    for name, (fn, items) in stages.items():
+        results[name] = _time(fn, repeat) | {"items": items}
+    return results
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Mapping
+
+from compress import Precompressor, remove_siblings
+from logger import logger
+from manifest import hash_bytes, sidecar_path
+from tracing import traced
+from utils import file_hash, walk_tree
+
+# files referenced by URL from pages; things like robots.txt or favicon.ico
+# are fetched under fixed names and keep only those
+FINGERPRINT_SUFFIXES = {
+    ".css",
+    ".js",
+    ".mjs",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".avif",
+    ".svg",
+    ".woff",
+    ".woff2",
+    ".ttf",
+    ".otf",
+}
+HASH_LENGTH = 8
+
+# not data-src and the like, which belong to scripts
+_URL_ATTR_RE = re.compile(r"""(?<![\w-])(href|src)=(["'])(.*?)\2""")
+
+
+def hashed_name(rel: str, digest: str) -> str:
+    # images/logo.png -> images/logo.3f2a9c1b.png
+    stem, _, suffix = rel.rpartition(".")
+    return f"{stem}.{digest[:HASH_LENGTH]}.{suffix}"
+
+
+def asset_digest(urls: Mapping[str, str]) -> str:
+    return hash_bytes(json.dumps(sorted(urls.items())).encode("utf-8"))
+
+
+def rewrite_asset_urls(html: str, urls: Mapping[str, str]) -> str:
+    def replace(match: re.Match[str]) -> str:
+        attr, quote, url = match.groups()
+        hashed = urls.get(url)
+        return match.group(0) if hashed is None else f"{attr}={quote}{hashed}{quote}"
+
+    return _URL_ATTR_RE.sub(replace, html)
+
+
+def _place(plain: Path, hashed: Path) -> None:
+    # the hashed name is another link to the copy under the plain name, so
+    # references that aren't rewritten (e.g. url() in CSS) keep working
+    try:
+        os.link(plain, hashed)
+    except OSError:
+        shutil.copy2(plain, hashed)
+
+
+@traced("fingerprint_assets")
+def fingerprint_assets(
+    src: str,
+    dest: str,
+    compressor: Precompressor | None = None,
+    place: bool = True,
+) -> dict[str, str]:
+    # runs after copy_static; returns "/index.css" -> "/index.3f2a9c1b.css".
+    # With place=False only the mapping is worked out, for a build shard
+    # that renders pages against assets another shard copies
+    state_path = sidecar_path(Path(dest), "assets")
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        state = {}
+    # rel -> [size, mtime_ns, sha256], so unchanged files aren't re-hashed
+    cached: dict[str, list] = state.get("hashes", {})
+    previous: dict[str, str] = state.get("assets", {})
+
+    files, _ = walk_tree(src)
+    hashes: dict[str, list] = {}
+    assets: dict[str, str] = {}
+    hashed_count = 0
+    for rel, st in sorted(files.items()):
+        if os.path.splitext(rel)[1].lower() not in FINGERPRINT_SUFFIXES:
+            continue
+        entry = cached.get(rel)
+        if entry is not None and entry[:2] == [st.st_size, st.st_mtime_ns]:
+            digest = entry[2]
+        else:
+            digest = file_hash(os.path.join(src, rel))
+            hashed_count += 1
+        hashes[rel] = [st.st_size, st.st_mtime_ns, digest]
+        assets[rel] = hashed_name(rel, digest)
+
+        if not place:
+            continue
+        hashed = Path(dest, assets[rel])
+        # the name is the content, so an existing file is already right
+        if not hashed.exists():
+            _place(Path(dest, rel), hashed)
+        if compressor is not None:
+            compressor.add(hashed)
+
+    for rel, old in previous.items():
+        if place and assets.get(rel) != old:
+            stale = Path(dest, old)
+            stale.unlink(missing_ok=True)
+            remove_siblings(stale)
+
+    state_path.write_text(
+        json.dumps({"assets": assets, "hashes": hashes}, indent=1, sort_keys=True),
+        encoding="utf-8",
+    )
+    logger.info("assets: %d fingerprinted, %d hashed", len(assets), hashed_count)
+    return {f"/{rel}": f"/{hashed}" for rel, hashed in assets.items()}
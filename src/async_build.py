@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Mapping, Sequence
+
+from block_cache import BlockCache
+from compress import Precompressor, precompress
+from logger import logger
+from minify import minify_html
+from output import write_output
+from page import PageResult, generate_page, render_page
+from render_cache import RenderCache
+from template import Template
+from tracing import span
+
+
+def _read_source(path: Path, stream_threshold: int | None) -> str | None:
+    # None when the file is big enough to be streamed instead; checking the
+    # size on the open file saves a separate stat round trip
+    with span("read", path=str(path)), path.open(encoding="utf-8") as f:
+        if (
+            stream_threshold is not None
+            and os.fstat(f.fileno()).st_size >= stream_threshold
+        ):
+            return None
+        return f.read()
+
+
+def _render(
+    path: Path,
+    md: str,
+    template: Template,
+    block_cache: BlockCache | None,
+    render_cache: RenderCache | None,
+    minify: bool,
+    search: bool,
+    asset_urls: Mapping[str, str] | None,
+) -> tuple[str, str, list[str] | None]:
+    with span("generate_page", path=str(path)):
+        title, html, terms = render_page(
+            md, template, block_cache, render_cache, search, asset_urls
+        )
+        if minify:
+            html = minify_html(html)
+        return title, html, terms
+
+
+def _write_output(
+    path: Path, html: str, compare: bool, compressor: Precompressor | None
+) -> bool:
+    with span("write_html", path=str(path)):
+        changed = write_output(path, html, compare)
+    data = html.encode("utf-8") if compressor is not None else None
+    precompress(compressor, path, data)
+    return changed
+
+
+async def _build_pages(
+    pages: Sequence[tuple[Path, Path]],
+    template: Template,
+    io_jobs: int,
+    block_cache: BlockCache | None,
+    render_cache: RenderCache | None,
+    stream_threshold: int | None,
+    write_if_changed: bool,
+    compressor: Precompressor | None,
+    minify: bool,
+    search: bool,
+    asset_urls: Mapping[str, str] | None,
+) -> list[tuple[Path, str | None, PageResult | None]]:
+    loop = asyncio.get_running_loop()
+    # rendering holds the GIL, so one thread renders as fast as several and
+    # the caches never see concurrent access; file I/O gets its own pool
+    render_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+    io_pool = ThreadPoolExecutor(max_workers=io_jobs, thread_name_prefix="io")
+    # bounds how many sources and rendered pages are held in memory at once
+    in_flight = asyncio.Semaphore(io_jobs * 2)
+
+    async def build(
+        from_path: Path, dest_path: Path
+    ) -> tuple[str | None, PageResult | None]:
+        async with in_flight:
+            try:
+                md = await loop.run_in_executor(
+                    io_pool, _read_source, from_path, stream_threshold
+                )
+                if md is None:
+                    result = await loop.run_in_executor(
+                        render_pool,
+                        generate_page,
+                        from_path,
+                        template,
+                        dest_path,
+                        block_cache,
+                        None,
+                        stream_threshold,
+                        write_if_changed,
+                        compressor,
+                        minify,
+                        search,
+                        asset_urls,
+                    )
+                    return None, result
+                logger.debug(
+                    "generating page from '%s' to '%s'", from_path, dest_path
+                )
+                title, html, terms = await loop.run_in_executor(
+                    render_pool,
+                    _render,
+                    from_path,
+                    md,
+                    template,
+                    block_cache,
+                    render_cache,
+                    minify,
+                    search,
+                    asset_urls,
+                )
+                changed = await loop.run_in_executor(
+                    io_pool,
+                    _write_output,
+                    dest_path,
+                    html,
+                    write_if_changed,
+                    compressor,
+                )
+            except Exception as exc:
+                # report instead of raising so one bad page doesn't stop the rest
+                return f"{type(exc).__name__}: {exc}", None
+            return None, PageResult(title, changed, terms)
+
+    try:
+        results = await asyncio.gather(*(build(src, dest) for src, dest in pages))
+    finally:
+        render_pool.shutdown()
+        io_pool.shutdown()
+    return [(from_path, *result) for (from_path, _), result in zip(pages, results)]
+
+
+def generate_pages_async(
+    pages: Sequence[tuple[Path, Path]],
+    template: Template,
+    io_jobs: int,
+    block_cache: BlockCache | None = None,
+    render_cache: RenderCache | None = None,
+    stream_threshold: int | None = None,
+    write_if_changed: bool = False,
+    compressor: Precompressor | None = None,
+    minify: bool = False,
+    search: bool = False,
+    asset_urls: Mapping[str, str] | None = None,
+) -> list[tuple[Path, str | None, PageResult | None]]:
+    # for slow (e.g. network) filesystems: up to io_jobs reads and writes
+    # stay in flight while pages render, instead of waiting on each in turn
+    if not pages:
+        return []
+    return asyncio.run(
+        _build_pages(
+            pages,
+            template,
+            io_jobs,
+            block_cache,
+            render_cache,
+            stream_threshold,
+            write_if_changed,
+            compressor,
+            minify,
+            search,
+            asset_urls,
+        )
+    )
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+
+
+class BlockCache:
+    # LRU of block markdown -> rendered block HTML, bounded by entry count
+    # and by the approximate memory of the cached strings
+    def __init__(
+        self, max_bytes: int = 32 << 20, max_entries: int | None = None
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        # block -> its visible text, for blocks put while collecting it
+        self._texts: dict[str, str] = {}
+        self._salt = ""
+
+    @property
+    def salt(self) -> str:
+        # anything else that changes rendered blocks, e.g. asset hashes;
+        # changing it drops every entry
+        return self._salt
+
+    @salt.setter
+    def salt(self, salt: str) -> None:
+        if salt != self._salt:
+            self.clear()
+            self._salt = salt
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, block: str) -> bool:
+        return block in self._entries
+
+    @staticmethod
+    def _size(block: str, html: str, text: str | None = None) -> int:
+        size = sys.getsizeof(block) + sys.getsizeof(html)
+        return size if text is None else size + sys.getsizeof(text)
+
+    def get(self, block: str) -> str | None:
+        html = self._entries.get(block)
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(block)
+        return html
+
+    def text(self, block: str) -> str | None:
+        # None if the block was put without its text
+        return self._texts.get(block)
+
+    def put(self, block: str, html: str, text: str | None = None) -> None:
+        size = self._size(block, html, text)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(block, None)
+        if old is not None:
+            self.bytes -= self._size(block, old, self._texts.pop(block, None))
+
+        self._entries[block] = html
+        if text is not None:
+            self._texts[block] = text
+        self.bytes += size
+        while self.bytes > self.max_bytes or (
+            self.max_entries is not None and len(self._entries) > self.max_entries
+        ):
+            evicted_block, evicted_html = self._entries.popitem(last=False)
+            self.bytes -= self._size(
+                evicted_block, evicted_html, self._texts.pop(evicted_block, None)
+            )
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._texts.clear()
+        self.bytes = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"BlockCache({len(self._entries)} entries, {self.bytes} bytes, "
+            f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions)"
+        )
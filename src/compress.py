@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Protocol
+
+from output import OutputFile
+
+GZIP_LEVEL = 9
+ZSTD_LEVEL = 19
+# already-compressed formats gain nothing, so only text-like files get siblings
+COMPRESSIBLE_SUFFIXES = {
+    ".html",
+    ".css",
+    ".js",
+    ".mjs",
+    ".json",
+    ".map",
+    ".svg",
+    ".xml",
+    ".txt",
+    ".wasm",
+}
+_CHUNK = 1 << 16
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes, /) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+def _gzip() -> _Compressor:
+    # wbits=31 writes a gzip wrapper with a zero mtime, so output is
+    # reproducible, unlike gzip.compress which stamps the current time
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+
+# sibling suffix -> new streaming compressor
+ENCODINGS: dict[str, Callable[[], _Compressor]] = {".gz": _gzip}
+
+try:
+    from compression import zstd  # type: ignore[import-not-found]
+except ImportError:  # before Python 3.14
+    pass
+else:
+    ENCODINGS[".zst"] = lambda: zstd.ZstdCompressor(level=ZSTD_LEVEL)
+
+
+def sibling(path: Path, suffix: str) -> Path:
+    return path.with_name(path.name + suffix)
+
+
+def remove_siblings(path: Path) -> None:
+    for suffix in ENCODINGS:
+        try:
+            sibling(path, suffix).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def precompress(
+    compressor: Precompressor | None, path: Path, data: bytes | None = None
+) -> None:
+    # for every output write: without a compressor, siblings left by an
+    # earlier --precompress build would go on serving the old content
+    if compressor is None:
+        remove_siblings(path)
+    else:
+        compressor.add(path, data)
+
+
+def _is_fresh(path: Path, st: os.stat_result, data: bytes | None) -> bool:
+    # siblings carry the mtime of the file they were made from
+    for suffix in ENCODINGS:
+        try:
+            if sibling(path, suffix).stat().st_mtime_ns != st.st_mtime_ns:
+                return False
+        except FileNotFoundError:
+            return False
+    # mtimes can match by chance (coarse timestamps, copies that keep them),
+    # so also check the gzip trailer's CRC-32 and size of the original
+    try:
+        with sibling(path, ".gz").open("rb") as f:
+            f.seek(-8, os.SEEK_END)
+            crc, size = struct.unpack("<II", f.read(8))
+    except OSError:
+        return False
+    if size != st.st_size & 0xFFFFFFFF:
+        return False
+    return data is None or crc == zlib.crc32(data)
+
+
+def _write_sibling(path: Path, suffix: str, chunks: Iterable[bytes]) -> None:
+    compressor = ENCODINGS[suffix]()
+    with OutputFile(sibling(path, suffix), binary=True) as fp:
+        for chunk in chunks:
+            fp.write(compressor.compress(chunk))
+        fp.write(compressor.flush())
+
+
+def _read_chunks(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        yield from iter(lambda: f.read(_CHUNK), b"")
+
+
+class Precompressor:
+    # writes .gz (and .zst where the stdlib has it) next to output files so
+    # the web server can serve them as is. zlib releases the GIL, so a
+    # thread pool compresses in parallel with rendering; jobs=0 compresses
+    # inline, e.g. inside a pool worker process.
+    def __init__(self, min_size: int = 1024, jobs: int | None = None) -> None:
+        self.min_size = min_size
+        self.jobs = (os.cpu_count() or 1) if jobs is None else jobs
+        self.compressed = 0
+        self.skipped = 0
+        self._pool = (
+            ThreadPoolExecutor(self.jobs, thread_name_prefix="compress")
+            if self.jobs > 0
+            else None
+        )
+        # bounds the page bytes waiting in the queue
+        self._slots = threading.BoundedSemaphore(max(1, self.jobs) * 4)
+        self._futures: list[Future[bool | None]] = []
+
+    def add(self, path: Path, data: bytes | None = None) -> None:
+        # data is the file's content when the caller still has it in memory
+        if path.suffix not in COMPRESSIBLE_SUFFIXES:
+            return
+        if self._pool is None:
+            self._count(self._compress(path, data))
+            return
+        self._slots.acquire()
+        future = self._pool.submit(self._compress, path, data)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def wait(self) -> None:
+        futures, self._futures = self._futures, []
+        for future in futures:
+            self._count(future.result())
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+
+    def _count(self, compressed: bool | None) -> None:
+        if compressed:
+            self.compressed += 1
+        elif compressed is not None:
+            self.skipped += 1
+
+    def _compress(self, path: Path, data: bytes | None) -> bool | None:
+        # True if siblings were written, False if they were up to date and
+        # None if the file is too small to bother
+        st = path.stat()
+        if st.st_size < self.min_size:
+            remove_siblings(path)
+            return None
+        if _is_fresh(path, st, data):
+            return False
+        for suffix in ENCODINGS:
+            chunks = [data] if data is not None else _read_chunks(path)
+            _write_sibling(path, suffix, chunks)
+            os.utime(sibling(path, suffix), ns=(st.st_atime_ns, st.st_mtime_ns))
+        return True
+
+    def __repr__(self) -> str:
+        return (
+            f"Precompressor({', '.join(ENCODINGS)}, "
+            f"{self.compressed} compressed, {self.skipped} up to date)"
+        )
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
+# errors meaning "this kernel or filesystem can't do it", not a real failure
+_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM}
+
+
+def same_filesystem(a: str, b: str) -> bool:
+    return os.stat(a).st_dev == os.stat(b).st_dev
+
+
+def copy_file(src: str, dst: str, size: int, link: bool = False) -> None:
+    # never write through an existing file: it may be a hardlink to the source
+    try:
+        os.remove(dst)
+    except FileNotFoundError:
+        pass
+
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError as exc:
+            if exc.errno not in _UNSUPPORTED:
+                raise
+
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            _kernel_copy(fsrc.fileno(), fdst.fileno(), size)
+    except OSError as exc:
+        if exc.errno not in _UNSUPPORTED:
+            raise
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+def _kernel_copy(infd: int, outfd: int, size: int) -> None:
+    # copy_file_range can reflink or copy server-side; sendfile at least
+    # keeps the bytes out of user space
+    if hasattr(os, "copy_file_range"):
+        while os.copy_file_range(infd, outfd, max(size, 1 << 20)):
+            pass
+        return
+
+    offset = 0
+    while True:
+        sent = os.sendfile(outfd, infd, offset, max(size - offset, 1 << 20))
+        if not sent:
+            return
+        offset += sent
+
+
+def copy_files(
+    files: Sequence[tuple[str, str, int]],
+    jobs: int | None = None,
+    link: bool = False,
+) -> None:
+    if jobs == 1 or len(files) < 2:
+        for src, dst, size in files:
+            copy_file(src, dst, size, link)
+        return
+
+    # the copies are I/O bound and release the GIL, so threads are enough
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for _ in pool.map(lambda f: copy_file(f[0], f[1], f[2], link), files):
+            pass
@@ -1,8 +1,16 @@
 from __future__ import annotations
-from typing import Sequence
+import io
+from typing import Protocol, Sequence
+
+
+class SupportsWrite(Protocol):
+    def write(self, s: str, /) -> object: ...
 
 
 class HTMLNode:
+    # pages create one node per inline span, so skip the per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(
         self,
         tag: str | None = None,
@@ -18,6 +26,9 @@ class HTMLNode:
     def to_html(self) -> str:
         raise NotImplementedError
 
+    def write_html(self, fp: SupportsWrite) -> None:
+        raise NotImplementedError
+
     def props_to_html(self) -> str:
         if not self.props:
             return ""
@@ -39,10 +50,15 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(
         self, tag: str | None, value: str, props: dict[str, str] | None = None
     ) -> None:
-        super().__init__(tag=tag, value=value, props=props)
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
 
     def to_html(self) -> str:
         if self.value is None:
@@ -51,18 +67,26 @@ class LeafNode(HTMLNode):
             return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def write_html(self, fp: SupportsWrite) -> None:
+        fp.write(self.to_html())
+
     def __repr__(self) -> str:
         return f"HTMLNode({self.tag}, {self.value}, {self.props})"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(
         self,
         tag: str,
         children: Sequence[HTMLNode],
         props: dict[str, str] | None = None,
     ) -> None:
-        super().__init__(tag=tag, children=children, props=props)
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
 
     def to_html(self) -> str:
         if not self.tag:
@@ -70,4 +94,18 @@ class ParentNode(HTMLNode):
         if not self.children:
             raise ValueError("Parent nodes must have one or more children")
 
-        return f"<{self.tag}{self.props_to_html()}>{''.join(child.to_html() for child in self.children)}</{self.tag}>"
+        # serialize into one buffer instead of joining every subtree's string
+        buf = io.StringIO()
+        self.write_html(buf)
+        return buf.getvalue()
+
+    def write_html(self, fp: SupportsWrite) -> None:
+        if not self.tag:
+            raise ValueError("Parent nodes must have a tag")
+        if not self.children:
+            raise ValueError("Parent nodes must have one or more children")
+
+        fp.write(f"<{self.tag}{self.props_to_html()}>")
+        for child in self.children:
+            child.write_html(fp)
+        fp.write(f"</{self.tag}>")
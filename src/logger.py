@@ -1,3 +1,114 @@
+from __future__ import annotations
+
+import json
 import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
 
 logger = logging.getLogger("ssg")
+
+TEXT_FORMAT = "%(asctime)s - %(message)s"
+
+# what configure_logging was last called with, so worker processes can set
+# up the same destination for themselves
+_settings: dict[str, Any] | None = None
+_listener: logging.handlers.QueueListener | None = None
+# the handler configure_logging added, and the logger's handlers, level and
+# propagate flag from before, which shutdown_logging puts back
+_installed: logging.Handler | None = None
+_previous: tuple[list[logging.Handler], int, bool] | None = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def configure_logging(
+    path: str | Path | None = "ssg.log",
+    level: int | str = logging.INFO,
+    json_lines: bool = False,
+    background: bool = True,
+) -> None:
+    # called from entry points only; importing the modules never touches
+    # the filesystem. With background=True records are queued and a
+    # listener thread does the formatting and the writes.
+    global _settings, _listener, _installed, _previous
+    shutdown_logging()
+    _settings = {"path": path, "level": level, "json_lines": json_lines}
+
+    handler: logging.Handler
+    if path is None:
+        handler = logging.StreamHandler()
+    else:
+        handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(
+        JsonLinesFormatter() if json_lines else logging.Formatter(TEXT_FORMAT)
+    )
+
+    _previous = (logger.handlers[:], logger.level, logger.propagate)
+    for old in _previous[0]:
+        logger.removeHandler(old)
+    logger.setLevel(level)
+    logger.propagate = False
+
+    if background:
+        records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        _installed = logging.handlers.QueueHandler(records)
+        _listener = logging.handlers.QueueListener(records, handler)
+        _listener.start()
+    else:
+        _installed = handler
+    logger.addHandler(_installed)
+
+
+def worker_settings() -> dict[str, Any] | None:
+    return dict(_settings) if _settings is not None else None
+
+
+def configure_worker_logging(settings: dict[str, Any] | None) -> None:
+    # pool workers write straight to the same destination; a forked worker
+    # would otherwise inherit a queue with no listener behind it
+    global _listener
+    # the listener thread belongs to the parent, there's nothing to stop here
+    _listener = None
+    if settings is None:
+        for old in logger.handlers[:]:
+            logger.removeHandler(old)
+        return
+    configure_logging(**settings, background=False)
+
+
+def shutdown_logging() -> None:
+    # flushes whatever the background writer still has queued, then leaves
+    # the logger as it was before configure_logging
+    global _settings, _listener, _installed, _previous
+    _settings = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _installed is not None:
+        logger.removeHandler(_installed)
+        _installed.close()
+        _installed = None
+    if _previous is not None:
+        handlers, level, propagate = _previous
+        for handler in handlers:
+            logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = propagate
+        _previous = None
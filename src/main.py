@@ -1,59 +1,771 @@
 from __future__ import annotations
 
-import logging
+import argparse
+import shutil
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, Mapping
 
-from markdown_handler import extract_title, markdown_to_html_node
+import tracing
+from assets import asset_digest, fingerprint_assets, rewrite_asset_urls
+from async_build import generate_pages_async
+from block_cache import BlockCache
+from compress import Precompressor, remove_siblings
+from logger import configure_logging, logger, shutdown_logging
+from manifest import BuildManifest, hash_bytes
+from markdown_handler import extract_title, parse_document
+from minify import minify_html
+from page import PageResult, generate_page
+from parallel import BuildError, generate_pages_parallel
+from render_cache import RenderCache
+from search import SearchIndex, page_terms
+from shard import MergeError, merge_shards, parse_shard, shard_dir, shard_pages
+from sitemap import PageEntry, page_url, write_feed, write_sitemaps
+from template import Template, build_time, compile_page_template
 from utils import copy_static
-from logger import logger
+from watcher import Changes, poll, snapshot
 
-logging.basicConfig(
-    filename="ssg.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(message)s",
-)
 
+@dataclass
+class BuildSummary:
+    rewritten: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    # left alone by an incremental build
+    skipped: int = 0
+    removed: int = 0
 
+    def __str__(self) -> str:
+        return (
+            f"rewritten {self.rewritten}, unchanged {self.unchanged}, "
+            f"failed {self.failed}, skipped {self.skipped}, removed {self.removed}"
+        )
+
+
+@tracing.traced("generate_pages_recursive")
 def generate_pages_recursive(
     content_dir: str | Path,
     template_path: str | Path,
     public_dir: str | Path,
+    incremental: bool = False,
+    jobs: int = 1,
+    block_cache: BlockCache | None = None,
+    render_cache: RenderCache | None = None,
+    stream_threshold: int | None = None,
+    io_jobs: int = 0,
+    write_if_changed: bool = False,
+    compressor: Precompressor | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+    minify: bool = False,
+    base_url: str | None = None,
+    search: bool = False,
+    shard: tuple[int, int] | None = None,
+) -> BuildSummary:
+    content_dir = Path(content_dir)
+    template_path = Path(template_path)
+    public_dir = Path(public_dir)
+
+    template_source = template_path.read_text(encoding="utf-8")
+    template = compile_page_template(template_source, BuildTime=build_time())
+    template_key = template_source
+    asset_urls = asset_urls or {}
+    salt = ""
+    if asset_urls:
+        template = template.map_static(
+            lambda html: rewrite_asset_urls(html, asset_urls)
+        )
+        # pages embed the hashed names, so a changed asset changes them too
+        salt = asset_digest(asset_urls)
+        template_key += "\0" + salt
+    # cached blocks and pages have the hashed names baked in as well
+    if block_cache is not None:
+        block_cache.salt = salt
+    if render_cache is not None:
+        render_cache.salt = salt
+    if minify:
+        # the markup around the placeholders is minified once here; pages
+        # only run their own content through the minifier
+        template = template.transform(minify_html)
+        template_key += "\0minify"
+    if search:
+        # an index left behind by builds without search would have missed
+        # the pages they changed
+        template_key += "\0search"
+    if compressor is not None:
+        # so turning --precompress on or off rebuilds every page, adding or
+        # removing its siblings
+        template_key += "\0precompress"
+
+    manifest = None
+    template_hash = hash_bytes(template_key.encode("utf-8"))
+    if incremental:
+        manifest = BuildManifest.load(public_dir, template_hash)
+    elif shard is not None:
+        # merge needs to know which pages each shard built, and a shard with
+        # none still leaves a directory behind for it
+        manifest = BuildManifest(public_dir, template_hash)
+        public_dir.mkdir(parents=True, exist_ok=True)
+    search_index = SearchIndex(public_dir) if search else None
+    summary = BuildSummary()
+    seen: set[str] = set()
+    source_hashes: dict[Path, tuple[str, str]] = {}
+    pending: list[tuple[Path, Path]] = []
+    # for the sitemap and feed: pages that are built get these from the
+    # build, skipped ones from the manifest
+    mtimes: dict[Path, float] = {}
+    titles: dict[Path, str] = {}
+    skipped: list[tuple[Path, Path]] = []
+
+    with tracing.span("scan"):
+        md_paths = list(content_dir.rglob("*.md"))
+        if shard is not None:
+            md_paths = shard_pages(md_paths, content_dir, shard)
+        for md_path in md_paths:
+            rel = md_path.relative_to(content_dir)
+            out_path = _output_path(public_dir, rel)
+
+            if manifest is not None:
+                source = rel.as_posix()
+                source_hash = hash_bytes(md_path.read_bytes())
+                seen.add(source)
+                if incremental and manifest.is_fresh(source, source_hash, out_path):
+                    summary.skipped += 1
+                    skipped.append((md_path, out_path))
+                    if base_url is not None:
+                        titles[md_path], mtimes[md_path] = _recorded_page(
+                            manifest, source, md_path, out_path
+                        )
+                    if search_index is not None and not search_index.keep(source):
+                        _index_skipped_page(
+                            search_index,
+                            manifest,
+                            source,
+                            md_path,
+                            out_path,
+                            page_url("", public_dir, out_path),
+                        )
+                    continue
+                source_hashes[md_path] = (source, source_hash)
+
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            pending.append((md_path, out_path))
+            mtimes[md_path] = md_path.stat().st_mtime
+
+    failures: list[tuple[Path, str]] = []
+    results: Iterable[tuple[Path, str | None, PageResult | None]]
+    if io_jobs > 0:
+        results = generate_pages_async(
+            pending,
+            template,
+            io_jobs,
+            block_cache=block_cache,
+            render_cache=render_cache,
+            stream_threshold=stream_threshold,
+            write_if_changed=write_if_changed,
+            compressor=compressor,
+            minify=minify,
+            search=search,
+            asset_urls=asset_urls,
+        )
+    elif jobs > 1:
+        results = generate_pages_parallel(
+            pending,
+            template,
+            jobs,
+            trace=tracing.is_enabled(),
+            block_cache=block_cache,
+            render_cache=render_cache,
+            stream_threshold=stream_threshold,
+            write_if_changed=write_if_changed,
+            compressor=compressor,
+            asset_urls=asset_urls,
+            minify=minify,
+            search=search,
+        )
+    else:
+        # a serial build stops at the first broken page
+        results = (
+            (
+                md_path,
+                None,
+                generate_page(
+                    md_path,
+                    template,
+                    out_path,
+                    block_cache,
+                    render_cache,
+                    stream_threshold,
+                    write_if_changed,
+                    compressor,
+                    minify,
+                    search,
+                    asset_urls,
+                ),
+            )
+            for md_path, out_path in pending
+        )
+    outputs = dict(pending)
+    for md_path, error, result in results:
+        source = md_path.relative_to(content_dir).as_posix()
+        if result is None:
+            logger.error("failed to generate '%s': %s", md_path, error)
+            failures.append((md_path, str(error)))
+            if search_index is not None:
+                search_index.keep(source)
+            continue
+        titles[md_path] = result.title
+        if search_index is not None and result.terms is not None:
+            url = page_url("", public_dir, outputs[md_path])
+            search_index.add(source, url, result.title, result.terms)
+        if result.changed:
+            summary.rewritten += 1
+        else:
+            summary.unchanged += 1
+    summary.failed = len(failures)
+
+    if base_url is not None:
+        site_pages = [
+            PageEntry(
+                page_url(base_url, public_dir, out_path),
+                titles[md_path],
+                mtimes[md_path],
+            )
+            for md_path, out_path in skipped + pending
+            # failed pages have no title
+            if md_path in titles
+        ]
+        _write_sitemap_and_feed(
+            public_dir, base_url, site_pages, write_if_changed, compressor
+        )
+    if search_index is not None:
+        rewritten = search_index.write(write_if_changed, compressor)
+        logger.info(
+            "search index: %d pages, %d shard(s) rewritten",
+            len(search_index.pages),
+            rewritten,
+        )
+    if compressor is not None:
+        compressor.wait()
+
+    if block_cache is not None:
+        logger.info("block cache: %r", block_cache)
+    if render_cache is not None:
+        logger.info("render cache: %r", render_cache)
+        render_cache.prune()
+
+    if manifest is not None:
+        failed = {md_path for md_path, _ in failures}
+        for md_path, out_path in pending:
+            if md_path not in failed:
+                manifest.record(
+                    *source_hashes[md_path],
+                    out_path,
+                    titles[md_path],
+                    mtimes[md_path],
+                )
+        for removed in manifest.prune(seen):
+            logger.info("removed stale page '%s'", removed)
+            remove_siblings(removed)
+            summary.removed += 1
+        manifest.save()
+
+    logger.info("pages: %s", summary)
+    if failures:
+        raise BuildError(failures)
+    return summary
+
+
+def _output_path(public_dir: Path, rel: Path) -> Path:
+    return (public_dir / rel).with_suffix(".html")
+
+
+def _write_sitemap_and_feed(
+    public_dir: Path,
+    base_url: str,
+    site_pages: list[PageEntry],
+    write_if_changed: bool,
+    compressor: Precompressor | None,
+) -> None:
+    sitemaps = write_sitemaps(
+        public_dir, base_url, site_pages, write_if_changed, compressor
+    )
+    write_feed(public_dir, base_url, site_pages, write_if_changed, compressor)
+    logger.info("sitemap: %d urls in %d file(s)", len(site_pages), len(sitemaps))
+
+
+def _recorded_page(
+    manifest: BuildManifest, source: str, md_path: Path, out_path: Path
+) -> tuple[str, float]:
+    entry = manifest.pages[source]
+    title, mtime = entry.get("title"), entry.get("mtime")
+    if title is None or mtime is None:
+        # recorded before the manifest kept these; fill them in once
+        title = extract_title(md_path.read_text(encoding="utf-8"))
+        mtime = md_path.stat().st_mtime
+        manifest.record(source, entry["source_hash"], out_path, title, mtime)
+    return title, mtime
+
+
+def _index_skipped_page(
+    index: SearchIndex,
+    manifest: BuildManifest,
+    source: str,
+    md_path: Path,
+    out_path: Path,
+    url: str,
+) -> None:
+    # a page the incremental build skips that the index doesn't have, e.g.
+    # on the first build after its state was lost
+    title, _ = _recorded_page(manifest, source, md_path, out_path)
+    texts: list[str] = []
+    parse_document(md_path.read_text(encoding="utf-8"), texts=texts)
+    index.add(source, url, title, page_terms(texts))
+
+
+def watch(
+    content_dir: str | Path,
+    template_path: str | Path,
+    static_dir: str | Path,
+    public_dir: str | Path,
+    interval: float = 0.5,
+    debounce: float = 0.2,
+    stop: threading.Event | None = None,
+    block_cache: BlockCache | None = None,
 ) -> None:
     content_dir = Path(content_dir)
     template_path = Path(template_path)
+    static_dir = Path(static_dir)
     public_dir = Path(public_dir)
 
-    template = template_path.read_text(encoding="utf-8")
+    def full_build() -> tuple[Template, BuildManifest]:
+        generate_pages_recursive(
+            content_dir,
+            template_path,
+            public_dir,
+            incremental=True,
+            block_cache=block_cache,
+        )
+        source = template_path.read_text(encoding="utf-8")
+        template = compile_page_template(source, BuildTime=build_time())
+        manifest = BuildManifest.load(public_dir, hash_bytes(source.encode("utf-8")))
+        return template, manifest
+
+    watched = [content_dir, static_dir, template_path]
+    # before building, so edits made while it runs show up as changes
+    initial = snapshot(watched)
+    copy_static(str(static_dir), str(public_dir), sync=True)
+    template, manifest = full_build()
+    print(f"watching {content_dir}, {static_dir} and {template_path}")
 
-    for md_path in content_dir.rglob("*.md"):
+    for first_seen, changes in poll(watched, interval, debounce, stop, initial):
+        changed = changes.added + changes.modified
+        report: list[str] = []
+        try:
+            touched = changed + changes.removed
+            if any(path.is_relative_to(static_dir) for path in touched):
+                stats = copy_static(str(static_dir), str(public_dir), sync=True)
+                report.append(f"static: {stats}")
+
+            if template_path in changed:
+                template, manifest = full_build()
+                report.append("template changed, rebuilt all pages")
+            else:
+                report.extend(
+                    _rebuild_pages(
+                        changes,
+                        content_dir,
+                        public_dir,
+                        template,
+                        manifest,
+                        block_cache,
+                    )
+                )
+        except Exception as exc:
+            # a broken edit shouldn't end the session
+            logger.exception("rebuild failed")
+            report.append(f"rebuild failed: {exc}")
+
+        elapsed = (time.monotonic() - first_seen) * 1000
+        print(f"{'; '.join(report) or 'nothing to rebuild'} ({elapsed:.0f} ms)")
+
+
+def _rebuild_pages(
+    changes: Changes,
+    content_dir: Path,
+    public_dir: Path,
+    template: Template,
+    manifest: BuildManifest,
+    block_cache: BlockCache | None,
+) -> list[str]:
+    report: list[str] = []
+    rebuilt = 0
+    for md_path in changes.added + changes.modified:
+        if md_path.suffix != ".md" or not md_path.is_relative_to(content_dir):
+            continue
         rel = md_path.relative_to(content_dir)
-        out_path = (public_dir / rel).with_suffix(".html")
+        out_path = _output_path(public_dir, rel)
+        source_hash = hash_bytes(md_path.read_bytes())
+        if manifest.is_fresh(rel.as_posix(), source_hash, out_path):
+            continue
+
         out_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            result = generate_page(md_path, template, out_path, block_cache)
+        except Exception as exc:
+            report.append(f"failed {rel}: {exc}")
+            continue
+        manifest.record(
+            rel.as_posix(),
+            source_hash,
+            out_path,
+            result.title,
+            md_path.stat().st_mtime,
+        )
+        rebuilt += 1
+
+    removed = 0
+    for md_path in changes.removed:
+        if md_path.suffix == ".md" and md_path.is_relative_to(content_dir):
+            output = manifest.remove(md_path.relative_to(content_dir).as_posix())
+            if output is not None:
+                remove_siblings(output)
+                removed += 1
 
-        generate_page(md_path, template, out_path)
+    if rebuilt or removed:
+        manifest.save()
+        report.insert(0, f"rebuilt {rebuilt} page(s), removed {removed}")
+    return report
 
 
-def generate_page(from_path: Path, template: str, dest_path: Path) -> None:
-    logger.info(f"Generating page from '{from_path}' to '{dest_path}'")
+def _shard_arg(spec: str) -> tuple[int, int]:
+    try:
+        return parse_shard(spec)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
 
-    md = from_path.read_text(encoding="utf-8")
-    html = markdown_to_html_node(md).to_html()
-    title = extract_title(md)
 
-    page = template.replace("{{ Title }}", title).replace("{{ Content }}", html)
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument(
+        "--shard",
+        type=_shard_arg,
+        metavar="I/N",
+        help="build only shard I (from 1) of N into public.shard-I, "
+        "for combining with merge",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only regenerate pages whose source or template changed",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="render pages in N worker processes",
+    )
+    parser.add_argument(
+        "--io-jobs",
+        type=int,
+        default=0,
+        metavar="N",
+        help="overlap up to N page reads and writes while rendering, "
+        "for slow filesystems (not with --jobs)",
+    )
+    parser.add_argument(
+        "--write-if-changed",
+        action="store_true",
+        help="leave output files whose content is unchanged untouched",
+    )
+    _add_merge_options(parser)
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a sharded search index of the pages to public/search/",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="collapse whitespace in pages, leaving <pre> and <code> as written",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="add content-hashed copies of static assets and link pages to them",
+    )
+    parser.add_argument(
+        "--block-cache-mb",
+        type=int,
+        default=32,
+        metavar="MB",
+        help="memory for caching rendered blocks shared across pages (0 disables)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        metavar="DIR",
+        help="keep rendered pages in DIR and reuse them across builds",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=512,
+        metavar="MB",
+        help="prune the render cache down to this size after each build",
+    )
+    parser.add_argument(
+        "--stream-threshold-mb",
+        type=int,
+        default=64,
+        metavar="MB",
+        help="parse and write markdown files of at least this size block by block",
+    )
+    parser.add_argument(
+        "--log-file",
+        default="ssg.log",
+        metavar="FILE",
+        help="where to write the build log ('-' for stderr)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="DEBUG adds a line per page and per static file",
+    )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        help="write the log as JSON lines",
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        metavar="FILE",
+        help="write a Chrome trace-event JSON of the build to FILE",
+    )
+    parser.add_argument(
+        "--trace-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="with --trace, list the N slowest pages",
+    )
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("build", help="build the site once (default)")
+    watch_parser = commands.add_parser(
+        "watch", help="rebuild changed pages and assets as files change"
+    )
+    watch_parser.add_argument(
+        "--interval", type=float, default=0.5, help="seconds between scans"
+    )
+    watch_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.2,
+        help="seconds the tree must be quiet before rebuilding",
+    )
+    commands.add_parser(
+        "prune-cache", help="shrink the render cache to --cache-max-mb and exit"
+    )
+    merge_parser = commands.add_parser(
+        "merge", help="combine the output of --shard builds into public/"
+    )
+    merge_parser.add_argument(
+        "shards", nargs="+", type=Path, metavar="DIR", help="e.g. public.shard-1"
+    )
+    _add_merge_options(merge_parser, default=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.io_jobs > 0 and args.jobs > 1:
+        parser.error("--io-jobs and --jobs cannot be combined")
+    if args.shard is not None:
+        if args.command not in (None, "build"):
+            parser.error(f"--shard only applies to builds, not {args.command}")
+        # each shard only sees its own pages
+        if args.base_url:
+            parser.error("--base-url goes with merge, not --shard")
+        if args.search:
+            parser.error("--search needs a full build, not --shard")
 
-    dest_path.write_text(page, encoding="utf-8")
+    configure_logging(
+        None if args.log_file == "-" else args.log_file,
+        level=args.log_level,
+        json_lines=args.log_json,
+    )
+    try:
+        _run(parser, args)
+    finally:
+        shutdown_logging()
 
 
-def main() -> None:
+def _add_merge_options(
+    parser: argparse.ArgumentParser, default: object = None
+) -> None:
+    # accepted before the command and after "merge"; the subcommand's copy
+    # defaults to SUPPRESS so it doesn't undo values given before it
+    def pick(value: object) -> object:
+        return value if default is None else default
+
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        default=pick(False),
+        help="write .gz (and .zst where supported) next to pages and static files",
+    )
+    parser.add_argument(
+        "--compress-min-size",
+        type=int,
+        default=pick(1024),
+        metavar="BYTES",
+        help="with --precompress, skip files smaller than this",
+    )
+    parser.add_argument(
+        "--base-url",
+        default=pick(None),
+        metavar="URL",
+        help="write sitemap.xml and an Atom feed.xml for the site served at URL",
+    )
+    parser.add_argument(
+        "--link-static",
+        action="store_true",
+        default=pick(False),
+        help="hardlink static files into public/ instead of copying them",
+    )
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
     project_root = Path(__file__).parent.parent
     static_dir = project_root / "static"
     public_dir = project_root / "public"
     content_dir = project_root / "content"
     template_path = str(project_root) + "/template.html"
 
-    copy_static(str(static_dir), str(public_dir))
-    generate_pages_recursive(content_dir, template_path, public_dir)
+    render_cache = (
+        RenderCache(args.cache_dir, max_bytes=args.cache_max_mb << 20)
+        if args.cache_dir
+        else None
+    )
+    if args.command == "prune-cache":
+        if render_cache is None:
+            parser.error("prune-cache needs --cache-dir")
+        removed, freed = render_cache.prune()
+        print(f"removed {removed} cache entries, freed {freed} bytes")
+        return
+
+    if args.command == "merge":
+        try:
+            _merge(args, public_dir)
+        except MergeError as exc:
+            parser.error(f"merge: {exc}")
+        return
+
+    block_cache = (
+        BlockCache(max_bytes=args.block_cache_mb << 20)
+        if args.block_cache_mb > 0
+        else None
+    )
+
+    if args.command == "watch":
+        try:
+            watch(
+                content_dir,
+                template_path,
+                static_dir,
+                public_dir,
+                interval=args.interval,
+                debounce=args.debounce,
+                block_cache=block_cache,
+            )
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.trace:
+        tracing.enable()
+
+    # static files are copied by the first shard only
+    copies_static = args.shard is None or args.shard[0] == 1
+    if args.shard is not None:
+        public_dir = shard_dir(public_dir, args.shard[0])
+    compressor = (
+        Precompressor(args.compress_min_size) if args.precompress else None
+    )
+    try:
+        if copies_static:
+            # incremental builds keep public/ and only sync what changed in static/
+            copy_static(
+                str(static_dir),
+                str(public_dir),
+                sync=args.incremental,
+                link=args.link_static,
+                compressor=compressor,
+            )
+        elif not args.incremental and public_dir.exists():
+            # what copy_static would have cleared out
+            shutil.rmtree(public_dir)
+        asset_urls = (
+            fingerprint_assets(
+                str(static_dir), str(public_dir), compressor, place=copies_static
+            )
+            if args.fingerprint
+            else None
+        )
+        summary = generate_pages_recursive(
+            content_dir,
+            template_path,
+            public_dir,
+            incremental=args.incremental,
+            jobs=args.jobs,
+            block_cache=block_cache,
+            render_cache=render_cache,
+            stream_threshold=args.stream_threshold_mb << 20,
+            io_jobs=args.io_jobs,
+            write_if_changed=args.write_if_changed,
+            compressor=compressor,
+            asset_urls=asset_urls,
+            minify=args.minify,
+            base_url=args.base_url,
+            search=args.search,
+            shard=args.shard,
+        )
+    finally:
+        if compressor is not None:
+            compressor.close()
+            logger.info("precompressed: %r", compressor)
+    print(f"pages: {summary}")
+
+    if args.trace:
+        events = tracing.disable()
+        tracing.write_chrome_trace(args.trace, events)
+        print(f"trace written to {args.trace}")
+        for event in tracing.slowest(events, n=args.trace_top):
+            print(f"{event['dur'] / 1000:10.2f} ms  {event['args']['path']}")
+
+
+def _merge(args: argparse.Namespace, public_dir: Path) -> None:
+    compressor = (
+        Precompressor(args.compress_min_size) if args.precompress else None
+    )
+    try:
+        manifest = merge_shards(args.shards, public_dir, link=args.link_static)
+        if args.base_url:
+            site_pages = [
+                PageEntry(
+                    page_url(args.base_url, public_dir, manifest.output_path(source)),
+                    entry["title"],
+                    entry["mtime"],
+                )
+                for source, entry in manifest.pages.items()
+            ]
+            _write_sitemap_and_feed(
+                public_dir, args.base_url, site_pages, False, compressor
+            )
+    finally:
+        if compressor is not None:
+            compressor.close()
+    print(f"merged {len(args.shards)} shard(s), {len(manifest.pages)} pages")
 
 
 if __name__ == "__main__":
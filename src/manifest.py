@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from markdown_handler import RENDERER_VERSION
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sidecar_path(output_dir: Path, name: str) -> Path:
+    # build state lives next to public/ so wiping the output dir doesn't
+    # lose it and it never gets deployed
+    return output_dir.with_name(f"{output_dir.name}.{name}.json")
+
+
+def manifest_path(public_dir: Path) -> Path:
+    return sidecar_path(public_dir, "manifest")
+
+
+class BuildManifest:
+    # outputs are kept relative to public_dir, so the manifest still holds
+    # when the directory is moved (merge picks shards up from anywhere)
+    def __init__(
+        self,
+        public_dir: Path,
+        template_hash: str,
+        pages: dict[str, dict[str, Any]] | None = None,
+    ) -> None:
+        self.public_dir = public_dir
+        self.path = manifest_path(public_dir)
+        self.template_hash = template_hash
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, public_dir: Path, template_hash: str) -> BuildManifest:
+        try:
+            data = json.loads(manifest_path(public_dir).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return cls(public_dir, template_hash)
+
+        pages = data.get("pages", {})
+        # a different template or renderer invalidates every page; the
+        # entries stay so pages deleted in the same build are still pruned
+        if (
+            data.get("renderer_version") != RENDERER_VERSION
+            or data.get("template_hash") != template_hash
+        ):
+            for entry in pages.values():
+                entry["source_hash"] = None
+        return cls(public_dir, template_hash, pages)
+
+    def output_path(self, source: str) -> Path:
+        return self.public_dir / self.pages[source]["output"]
+
+    def _relative(self, output: Path) -> str:
+        return output.relative_to(self.public_dir).as_posix()
+
+    def is_fresh(self, source: str, source_hash: str, output: Path) -> bool:
+        entry = self.pages.get(source)
+        return (
+            entry is not None
+            and entry["source_hash"] == source_hash
+            and entry["output"] == self._relative(output)
+            and output.exists()
+        )
+
+    def record(
+        self,
+        source: str,
+        source_hash: str,
+        output: Path,
+        title: str | None = None,
+        mtime: float | None = None,
+    ) -> None:
+        # title and mtime feed the sitemap and feed without re-reading the
+        # source of pages an incremental build skips
+        self.pages[source] = {
+            "source_hash": source_hash,
+            "output": self._relative(output),
+            "title": title,
+            "mtime": mtime,
+        }
+
+    def remove(self, source: str) -> Path | None:
+        if source not in self.pages:
+            return None
+        output = self.output_path(source)
+        del self.pages[source]
+        if not output.exists():
+            return None
+        output.unlink()
+        return output
+
+    def prune(self, seen: set[str]) -> list[Path]:
+        removed: list[Path] = []
+        for source in [s for s in self.pages if s not in seen]:
+            output = self.remove(source)
+            if output is not None:
+                removed.append(output)
+        return removed
+
+    def save(self) -> None:
+        data = {
+            "renderer_version": RENDERER_VERSION,
+            "template_hash": self.template_hash,
+            "pages": self.pages,
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
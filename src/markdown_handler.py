@@ -1,10 +1,21 @@
+import io
+import itertools
+import os
 import re
+import sys
 import textwrap
+from dataclasses import dataclass, field
 from enum import StrEnum
-from typing import Sequence
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping, Sequence
 
+from block_cache import BlockCache
 from textnode import TextNode, TextType, text_node_to_html_node
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, SupportsWrite
+from tracing import span, traced
+
+# bump whenever rendered output changes, so cached builds get invalidated
+RENDERER_VERSION = "1"
 
 
 class BlockType(StrEnum):
@@ -16,6 +27,97 @@ class BlockType(StrEnum):
     ORDERED_LIST = "ordered_list"
 
 
+_IMAGE_RE = re.compile(r"!\[(.*?)\]\((.*?)\)")
+_LINK_RE = re.compile(r"\[(.*?)\]\((.*?)\)")
+_HEADING_RE = re.compile(r"#{1,6} ")
+# an ordered list item number as int() parses it; int() skips the same
+# whitespace as \s except the \x1c-\x1f separators
+_LIST_NUMBER_RE = re.compile(r"[^\S\x1c-\x1f]*\+?(\d+(?:_\d+)*)[^\S\x1c-\x1f]*")
+
+# applied innermost-last, matching the order of the old split_nodes_* chain
+_INLINE_DELIMITERS = (
+    ("`", TextType.CODE),
+    ("**", TextType.BOLD),
+    ("_", TextType.ITALIC),
+)
+
+_ScanGap = Callable[[str, int, int, list[TextNode]], None]
+
+
+def _emit_text(text: str, start: int, end: int, out: list[TextNode]) -> None:
+    out.append(TextNode(text[start:end], TextType.TEXT))
+
+
+def _scan_delimited(
+    text: str,
+    start: int,
+    end: int,
+    delimiters: Sequence[tuple[str, TextType]],
+    level: int,
+    out: list[TextNode],
+) -> None:
+    # works on text[start:end] by index so no intermediate strings are built
+    if level == len(delimiters):
+        _emit_text(text, start, end, out)
+        return
+
+    delimiter, text_type = delimiters[level]
+    pos = text.find(delimiter, start, end)
+    if pos == -1:
+        _scan_delimited(text, start, end, delimiters, level + 1, out)
+        return
+
+    node_start = start
+    step = len(delimiter)
+    inside = False
+    while pos != -1:
+        if pos > start:
+            if inside:
+                out.append(TextNode(text[start:pos], text_type))
+            else:
+                _scan_delimited(text, start, pos, delimiters, level + 1, out)
+        inside = not inside
+        start = pos + step
+        pos = text.find(delimiter, start, end)
+
+    if inside:
+        raise ValueError(
+            f"Invalid markdown: unmatchted delimiter {delimiter!r} in {text[node_start:end]!r}"
+        )
+    if end > start:
+        _scan_delimited(text, start, end, delimiters, level + 1, out)
+
+
+def _scan_inline_delimiters(
+    text: str, start: int, end: int, out: list[TextNode]
+) -> None:
+    _scan_delimited(text, start, end, _INLINE_DELIMITERS, 0, out)
+
+
+def _scan_pattern(
+    text: str,
+    start: int,
+    end: int,
+    pattern: re.Pattern[str],
+    text_type: TextType,
+    out: list[TextNode],
+    scan_gap: _ScanGap,
+) -> None:
+    for match in pattern.finditer(text, start, end):
+        if match.start() > start:
+            scan_gap(text, start, match.start(), out)
+        out.append(TextNode(match.group(1), text_type, match.group(2)))
+        start = match.end()
+    if end > start:
+        scan_gap(text, start, end, out)
+
+
+def _scan_links(text: str, start: int, end: int, out: list[TextNode]) -> None:
+    _scan_pattern(
+        text, start, end, _LINK_RE, TextType.LINK, out, _scan_inline_delimiters
+    )
+
+
 def split_nodes_delimiter(
     old_nodes: list[TextNode], delimiter: str, text_type: TextType
 ) -> list[TextNode]:
@@ -23,29 +125,13 @@ def split_nodes_delimiter(
 
     for node in old_nodes:
         # only split plain text nodes
-        if node.text_type != TextType.TEXT.value:
+        if node.text_type != TextType.TEXT or delimiter not in node.text:
             new_nodes.append(node)
             continue
 
-        if delimiter not in node.text:
-            new_nodes.append(node)
-            continue
-
-        parts = node.text.split(delimiter)
-
-        if len(parts) % 2 == 0:
-            raise ValueError(
-                f"Invalid markdown: unmatchted delimiter {delimiter!r} in {node.text!r}"
-            )
-
-        for i, part in enumerate(parts):
-            if part == "":
-                continue
-
-            if i % 2 == 0:
-                new_nodes.append(TextNode(part, TextType.TEXT))
-            else:
-                new_nodes.append(TextNode(part, text_type))
+        _scan_delimited(
+            node.text, 0, len(node.text), ((delimiter, text_type),), 0, new_nodes
+        )
 
     return new_nodes
 
@@ -63,30 +149,28 @@ def extract_title(markdown: str) -> str:
 
 
 def extract_markdown_images(text: str) -> list[tuple[str, str]]:
-    return re.findall(r"!\[(.*?)\]\((.*?)\)", text)
+    return _IMAGE_RE.findall(text)
 
 
 def extract_markdown_links(text: str) -> list[tuple[str, str]]:
-    return re.findall(r"\[(.*?)\]\((.*?)\)", text)
+    return _LINK_RE.findall(text)
 
 
 def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
     new_nodes: list[TextNode] = []
     for node in old_nodes:
-        img_matches = extract_markdown_images(node.text)
-        if not img_matches:
+        if not _IMAGE_RE.search(node.text):
             new_nodes.append(node)
             continue
-        text = node.text
-        for alt, url in img_matches:
-            img_str = f"![{alt}]({url})"
-            before, after = text.split(img_str, maxsplit=1)
-            if before:
-                new_nodes.append(TextNode(before, TextType.TEXT))
-            new_nodes.append(TextNode(alt, TextType.IMAGE, url))
-            text = after
-        if text:
-            new_nodes.append(TextNode(text, TextType.TEXT))
+        _scan_pattern(
+            node.text,
+            0,
+            len(node.text),
+            _IMAGE_RE,
+            TextType.IMAGE,
+            new_nodes,
+            _emit_text,
+        )
 
     return new_nodes
 
@@ -94,35 +178,23 @@ def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
 def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     new_nodes: list[TextNode] = []
     for node in old_nodes:
-        link_matches = extract_markdown_links(node.text)
-        if not link_matches:
+        if not _LINK_RE.search(node.text):
             new_nodes.append(node)
             continue
-        text = node.text
-        for name, url in link_matches:
-            link_str = f"[{name}]({url})"
-            before, after = text.split(link_str, maxsplit=1)
-            if before:
-                new_nodes.append(TextNode(before, TextType.TEXT))
-            new_nodes.append(TextNode(name, TextType.LINK, url))
-            text = after
-
-        if text:
-            new_nodes.append(TextNode(text, TextType.TEXT))
+        _scan_pattern(
+            node.text, 0, len(node.text), _LINK_RE, TextType.LINK, new_nodes, _emit_text
+        )
     return new_nodes
 
 
 def text_to_textnodes(text: str) -> list[TextNode]:
-    nodes: list[TextNode] = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    for delimiter, text_type in [
-        ("`", TextType.CODE),
-        ("**", TextType.BOLD),
-        ("_", TextType.ITALIC),
-    ]:
-        nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+    # one left-to-right scan: images, then links in the gaps, then code,
+    # bold and italic in the remaining plain text
+    if not text:
+        return [TextNode(text, TextType.TEXT)]
 
+    nodes: list[TextNode] = []
+    _scan_pattern(text, 0, len(text), _IMAGE_RE, TextType.IMAGE, nodes, _scan_links)
     return nodes
 
 
@@ -141,104 +213,350 @@ def markdown_to_blocks(markdown: str) -> list[str]:
     return blocks
 
 
-def _is_ordered_list(block: str) -> bool:
-    match = re.match(r"^\D+\.*", block)
-    if match:
-        return False
-    num = 1
-    for line in block.split("\n"):
-        try:
-            num_str, _ = line.split(". ", maxsplit=1)
-            if not int(num_str) == num:
-                return False
-        except ValueError:
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+    # yields what markdown_to_blocks returns for "\n".join(lines), holding
+    # only the current block in memory
+    current: list[str] = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if line:
+            current.append(line)
+            continue
+        block = _finish_block(current)
+        current = []
+        if block:
+            yield block
+    block = _finish_block(current)
+    if block:
+        yield block
+
+
+def _finish_block(lines: list[str]) -> str:
+    block = "\n".join(lines).strip()
+    return "\n".join(line.rstrip() for line in block.splitlines())
+
+
+_WHITESPACE_ONLY_RE = re.compile(r"[ \t]+")
+_INDENT_RE = re.compile(r"[ \t]*")
+
+
+def _common_margin(lines: Iterable[str]) -> str:
+    # the margin textwrap.dedent would strip, computed one line at a time
+    margin: str | None = None
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line or _WHITESPACE_ONLY_RE.fullmatch(line):
+            continue
+        indent = _INDENT_RE.match(line).group()  # type: ignore[union-attr]
+        if margin is None or margin.startswith(indent):
+            margin = indent
+        elif not indent.startswith(margin):
+            margin = os.path.commonprefix([margin, indent])
+    return margin or ""
+
+
+def iter_markdown_file_blocks(path: str | Path) -> Iterator[str]:
+    # two streaming passes: one for the dedent margin, one for the blocks,
+    # so memory is bounded by the largest block rather than the file
+    with open(path, encoding="utf-8") as f:
+        margin = _common_margin(f)
+
+    def dedented(lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            line = line.rstrip("\n")
+            if _WHITESPACE_ONLY_RE.fullmatch(line):
+                yield ""
+            else:
+                yield line[len(margin) :] if line.startswith(margin) else line
+
+    with open(path, encoding="utf-8") as f:
+        yield from iter_markdown_blocks(dedented(f))
+
+
+class BlockStream(HTMLNode):
+    # a document whose blocks are rendered and written one at a time;
+    # it can only be written once. With texts, each block's visible text
+    # is appended to it as the block is rendered.
+    __slots__ = ("blocks", "cache", "texts", "asset_urls")
+
+    def __init__(
+        self,
+        blocks: Iterable[str],
+        cache: BlockCache | None = None,
+        texts: list[str] | None = None,
+        asset_urls: Mapping[str, str] | None = None,
+    ) -> None:
+        self.tag = "div"
+        self.value = None
+        self.children = None
+        self.props = None
+        self.blocks = blocks
+        self.cache = cache
+        self.texts = texts
+        self.asset_urls = asset_urls
+
+    def write_html(self, fp: SupportsWrite) -> None:
+        fp.write("<div>")
+        for block in self.blocks:
+            if self.cache is None:
+                node = block_to_html_node(block, self.texts, self.asset_urls)
+            else:
+                node = _cached_block_to_html_node(
+                    block, self.cache, self.texts, self.asset_urls
+                )
+            node.write_html(fp)
+        fp.write("</div>")
+
+    def to_html(self) -> str:
+        buf = io.StringIO()
+        self.write_html(buf)
+        return buf.getvalue()
+
+
+def stream_markdown_file(
+    path: str | Path,
+    cache: BlockCache | None = None,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> tuple[str, BlockStream]:
+    blocks = iter_markdown_file_blocks(path)
+    first = next(blocks, None)
+    if first is None or not first.startswith("# "):
+        raise ValueError("Title is missing")
+    blocks = itertools.chain([first], blocks)
+    return first[2:], BlockStream(blocks, cache, texts, asset_urls)
+
+
+def _is_ordered_list(lines: list[str]) -> bool:
+    for num, line in enumerate(lines, 1):
+        prefix, sep, _ = line.partition(". ")
+        if not sep:
+            return False
+        if prefix != str(num) and not _is_list_number(prefix, num):
             return False
-        num += 1
     return True
 
 
+def _is_list_number(prefix: str, num: int) -> bool:
+    # same rules as int(prefix) == num, for padded, signed or non-ASCII
+    # numbers, without raising on the common miss
+    match = _LIST_NUMBER_RE.fullmatch(prefix)
+    if match is None:
+        return False
+    digits = match.group(1).replace("_", "")
+    # int() refuses literals longer than this, so they were never a match
+    limit = sys.get_int_max_str_digits()
+    if limit and len(digits) > limit:
+        return False
+    return int(digits) == num
+
+
 def block_to_block_type(block: str) -> BlockType:
-    if re.match(r"^#{1,6} ", block):
+    if _HEADING_RE.match(block):
         return BlockType.HEADING
     if block.startswith("```\n") and block.endswith("```"):
         return BlockType.CODE
-    if all(line.startswith(">") for line in block.split("\n")):
-        return BlockType.QUOTE
-    if all(line.startswith("- ") for line in block.split("\n")):
-        return BlockType.UNORDERED_LIST
-    if _is_ordered_list(block):
-        return BlockType.ORDERED_LIST
+
+    # quotes, unordered and ordered lists need different first characters,
+    # so at most one of them is worth a scan; a line prefix holds on every
+    # line when each newline is followed by it
+    first = block[:1]
+    if first == ">":
+        if block.count("\n") == block.count("\n>"):
+            return BlockType.QUOTE
+    elif first == "-":
+        if block.startswith("- ") and block.count("\n") == block.count("\n- "):
+            return BlockType.UNORDERED_LIST
+    elif first.isdecimal():
+        if _is_ordered_list(block.split("\n")):
+            return BlockType.ORDERED_LIST
     return BlockType.PARAGRAPH
 
 
-def text_to_children(text: str) -> list[HTMLNode]:
+def text_to_children(
+    text: str,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> list[HTMLNode]:
+    # texts, when given, collects the visible text of each node (link and
+    # image URLs aren't part of it), e.g. for the search index
     children: Sequence[HTMLNode] = []
     for node in text_to_textnodes(text):
-        children.append(text_node_to_html_node(node))
+        if texts is not None:
+            texts.append(node.text)
+        children.append(text_node_to_html_node(node, asset_urls))
     return children
 
 
-def markdown_to_html_node(md: str) -> ParentNode:
-    md = textwrap.dedent(md).strip("\n")
-    blocks = markdown_to_blocks(md)
-    html_blocks = [block_to_html_node(block) for block in blocks]
+@dataclass
+class Document:
+    root: ParentNode
+    title: str
+    # (level, raw markdown text) of every heading, the title included
+    headings: list[tuple[int, str]] = field(default_factory=list)
+    blocks: list[str] = field(default_factory=list)
+
+
+@traced("parse_document")
+def parse_document(
+    md: str,
+    cache: BlockCache | None = None,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> Document:
+    # one pass over the source for the tree, the title and the outline (and
+    # the visible text, into texts, when given)
+    blocks = _document_blocks(md)
+    if not blocks or not blocks[0].startswith("# "):
+        raise ValueError("Title is missing")
+
+    headings = []
+    for block in blocks:
+        if _HEADING_RE.match(block):
+            hashes, _, text = block.partition(" ")
+            headings.append((len(hashes), text.lstrip()))
+
+    root = _blocks_to_html_node(blocks, cache, texts, asset_urls)
+    return Document(root, blocks[0][2:], headings, blocks)
+
+
+@traced("markdown_to_html_node")
+def markdown_to_html_node(md: str, cache: BlockCache | None = None) -> ParentNode:
+    return _blocks_to_html_node(_document_blocks(md), cache)
+
+
+def _document_blocks(md: str) -> list[str]:
+    with span("markdown_to_blocks"):
+        return markdown_to_blocks(textwrap.dedent(md).strip("\n"))
+
+
+def _blocks_to_html_node(
+    blocks: list[str],
+    cache: BlockCache | None,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> ParentNode:
+    with span("block_to_html_node", blocks=len(blocks)):
+        if cache is None:
+            html_blocks = [
+                block_to_html_node(block, texts, asset_urls) for block in blocks
+            ]
+        else:
+            html_blocks = [
+                _cached_block_to_html_node(block, cache, texts, asset_urls)
+                for block in blocks
+            ]
     return ParentNode("div", html_blocks)
 
 
-def block_to_html_node(block: str) -> ParentNode:
+def _cached_block_to_html_node(
+    block: str,
+    cache: BlockCache,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> HTMLNode:
+    # the cache has to be salted with asset_urls (see BlockCache.salt)
+    html = cache.get(block)
+    text = cache.text(block) if html is not None and texts is not None else None
+    if html is None or (texts is not None and text is None):
+        # a block cached without its text renders again to collect it
+        block_texts: list[str] | None = [] if texts is not None else None
+        html = block_to_html_node(block, block_texts, asset_urls).to_html()
+        text = "\n".join(block_texts) if block_texts is not None else None
+        cache.put(block, html, text)
+    if texts is not None and text is not None:
+        texts.append(text)
+    # a tagless leaf writes its value verbatim, so the cached markup slots
+    # into the page tree unchanged
+    return LeafNode(None, html)
+
+
+def block_to_html_node(
+    block: str,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> ParentNode:
+    # texts collects the block's visible text, as in text_to_children;
+    # asset_urls maps image URLs to their fingerprinted names
     block_type = block_to_block_type(block)
 
     match block_type:
         case BlockType.CODE:
-            return code_block_to_html_node(block)
+            return code_block_to_html_node(block, texts)
         case BlockType.HEADING:
-            return heading_block_to_html_node(block)
+            return heading_block_to_html_node(block, texts, asset_urls)
         case BlockType.QUOTE:
-            return quote_block_to_html_node(block)
+            return quote_block_to_html_node(block, texts, asset_urls)
         case BlockType.UNORDERED_LIST:
-            return ulist_block_to_html_node(block)
+            return ulist_block_to_html_node(block, texts, asset_urls)
         case BlockType.ORDERED_LIST:
-            return olist_block_to_html_node(block)
+            return olist_block_to_html_node(block, texts, asset_urls)
         case _:
-            return paragraph_block_to_html_node(block)
+            return paragraph_block_to_html_node(block, texts, asset_urls)
 
 
-def code_block_to_html_node(block: str) -> ParentNode:
+def code_block_to_html_node(block: str, texts: list[str] | None = None) -> ParentNode:
     lines = block.splitlines()
     text = "\n".join(lines[1:-1]) + "\n"
+    if texts is not None:
+        texts.append(text)
     return ParentNode("pre", [LeafNode("code", text)])
 
 
-def heading_block_to_html_node(block: str) -> ParentNode:
+def heading_block_to_html_node(
+    block: str,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> ParentNode:
     level = len(block.split()[0])  # "###" = 3 => h3
     text = block.split(maxsplit=1)[1] if len(block.split()) > 1 else ""
-    return ParentNode(f"h{level}", text_to_children(text))
+    return ParentNode(f"h{level}", text_to_children(text, texts, asset_urls))
 
 
-def quote_block_to_html_node(block: str) -> ParentNode:
+def quote_block_to_html_node(
+    block: str,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> ParentNode:
     # remove leading '>' and optional following space, line by line
     lines = [
         line[1:].lstrip() if line.startswith(">") else line
         for line in block.splitlines()
     ]
     text = " ".join(lines)
-    return ParentNode("blockquote", text_to_children(text))
+    return ParentNode("blockquote", text_to_children(text, texts, asset_urls))
 
 
-def paragraph_block_to_html_node(block: str) -> ParentNode:
+def paragraph_block_to_html_node(
+    block: str,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> ParentNode:
     text = " ".join(line.strip() for line in block.splitlines())
-    return ParentNode("p", text_to_children(text))
+    return ParentNode("p", text_to_children(text, texts, asset_urls))
 
 
-def ulist_block_to_html_node(block: str) -> ParentNode:
+def ulist_block_to_html_node(
+    block: str,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> ParentNode:
     # remove '- ' line by line
     items = [line.split(maxsplit=1)[1] for line in block.splitlines()]
-    li_nodes = [ParentNode("li", text_to_children(item)) for item in items]
+    li_nodes = [
+        ParentNode("li", text_to_children(item, texts, asset_urls)) for item in items
+    ]
     return ParentNode("ul", li_nodes)
 
 
-def olist_block_to_html_node(block: str) -> ParentNode:
+def olist_block_to_html_node(
+    block: str,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> ParentNode:
     # remove '\d. ' line by line
     items = [line.split(maxsplit=1)[1] for line in block.splitlines()]
-    li_nodes = [ParentNode("li", text_to_children(item)) for item in items]
+    li_nodes = [
+        ParentNode("li", text_to_children(item, texts, asset_urls)) for item in items
+    ]
     return ParentNode("ol", li_nodes)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import io
+import re
+
+from htmlnode import SupportsWrite
+
+# elements whose content is written out exactly as is
+RAW_ELEMENTS = frozenset({"pre", "code", "textarea", "script", "style"})
+# whitespace next to these never renders, so it can go entirely
+BLOCK_ELEMENTS = frozenset(
+    {
+        "!doctype",
+        "html",
+        "head",
+        "body",
+        "title",
+        "meta",
+        "link",
+        "script",
+        "style",
+        "article",
+        "section",
+        "nav",
+        "header",
+        "footer",
+        "main",
+        "aside",
+        "div",
+        "p",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "ul",
+        "ol",
+        "li",
+        "blockquote",
+        "pre",
+        "hr",
+        "table",
+        "thead",
+        "tbody",
+        "tr",
+        "th",
+        "td",
+        "figure",
+        "figcaption",
+    }
+)
+
+# HTML's whitespace; \s would also eat non-breaking spaces
+_WS_RE = re.compile(r"[ \t\n\r\f]+")
+# what can follow the "<" of a tag; anything else is a literal "<" in text
+_TAG_START_RE = re.compile(r"<[A-Za-z/!]")
+# inside a tag: its end, a quoted value, or a "<" that shows it wasn't one
+_TAG_STOP_RE = re.compile(r"""[<>"']""")
+_TAG_NAME_RE = re.compile(r"</?([!\w-]+)")
+_RAW_END_RE = {name: re.compile(f"</{name}", re.IGNORECASE) for name in RAW_ELEMENTS}
+# a tag that never ends (an unclosed quote; our renderer doesn't escape
+# text) is given up on after this much, and its "<" written out as text
+_MAX_TAG = 1 << 16
+
+
+class MinifyingWriter:
+    # collapses whitespace in HTML as it's written, in one pass over the
+    # chunks and whatever their boundaries: runs of whitespace in text
+    # become one space and disappear next to block-level tags. Tags and
+    # the content of RAW_ELEMENTS are passed through untouched.
+    def __init__(self, fp: SupportsWrite) -> None:
+        self.fp = fp
+        self._buf = ""
+        # whitespace seen but not yet written, until we know what follows
+        self._ws = False
+        self._after_block = False
+        # ends the raw element we're in, e.g. </pre
+        self._raw_end: re.Pattern[str] | None = None
+        # how far into the unfinished tag at the start of _buf we've
+        # scanned, and the quote we're inside there, so each write only
+        # scans what it added
+        self._scan = 0
+        self._quote: str | None = None
+
+    def write(self, s: str) -> int:
+        self._buf += s
+        self._drain()
+        return len(s)
+
+    def close(self) -> None:
+        # end of document: a partial tag or raw tail goes out as is, and
+        # trailing whitespace is dropped
+        if self._buf:
+            self._flush_ws(block=False)
+            self.fp.write(self._buf)
+            self._buf = ""
+        self._ws = False
+        self._scan = 0
+        self._quote = None
+
+    def _flush_ws(self, block: bool) -> None:
+        if self._ws and not (block or self._after_block):
+            self.fp.write(" ")
+        self._ws = False
+
+    def _drain(self) -> None:
+        buf = self._buf
+        pos = 0
+        write = self.fp.write
+        while pos < len(buf):
+            if self._raw_end is not None:
+                match = self._raw_end.search(buf, pos)
+                if match is None:
+                    # keep enough back to spot a closing tag split over chunks
+                    keep = max(pos, len(buf) - len(self._raw_end.pattern) + 1)
+                    write(buf[pos:keep])
+                    pos = keep
+                    break
+                write(buf[pos : match.start()])
+                pos = match.start()
+                self._raw_end = None
+                continue
+
+            lt = buf.find("<", pos)
+            if lt == -1:
+                self._text(buf[pos:])
+                pos = len(buf)
+                break
+            if lt > pos:
+                self._text(buf[pos:lt])
+                pos = lt
+            if pos + 1 == len(buf):
+                # can't tell yet
+                break
+            if not _TAG_START_RE.match(buf, pos):
+                self._text("<")
+                pos += 1
+                continue
+
+            tag_end = self._tag_end(buf, pos)
+            if tag_end == -1 and len(buf) - pos > _MAX_TAG:
+                tag_end = 0
+            if tag_end == -1:
+                break
+            if tag_end == 0:
+                # not a tag after all
+                self._scan = 0
+                self._quote = None
+                self._text("<")
+                pos += 1
+                continue
+            self._tag(buf[pos:tag_end])
+            pos = tag_end
+        self._buf = buf[pos:]
+
+    def _tag_end(self, buf: str, start: int) -> int:
+        # the end of the tag or comment opening at start; -1 if it isn't
+        # complete yet and 0 if it turns out not to be a tag. Picks up the
+        # scan where the last call for the same tag left off.
+        i = start + self._scan
+        if buf.startswith("<!--", start):
+            end = buf.find("-->", max(i, start + 4))
+            if end == -1:
+                # "--" might be the start of a "-->" split over writes
+                self._scan = max(4, len(buf) - start - 2)
+                return -1
+            self._scan = 0
+            return end + 3
+
+        i = max(i, start + 1)
+        quote = self._quote
+        while i < len(buf):
+            if quote is not None:
+                close = buf.find(quote, i)
+                if close == -1:
+                    i = len(buf)
+                    break
+                quote = None
+                i = close + 1
+                continue
+            match = _TAG_STOP_RE.search(buf, i)
+            if match is None:
+                i = len(buf)
+                break
+            i = match.end()
+            char = match.group()
+            if char in "<>":
+                self._scan = 0
+                self._quote = None
+                return i if char == ">" else 0
+            quote = char
+        self._scan = i - start
+        self._quote = quote
+        return -1
+
+    def _text(self, text: str) -> None:
+        parts = _WS_RE.split(text)
+        if parts[0] == "":
+            # leading whitespace
+            self._ws = self._ws or len(parts) > 1
+            parts = parts[1:]
+        trailing = len(parts) > 0 and parts[-1] == ""
+        if trailing:
+            parts = parts[:-1]
+        if parts:
+            self._flush_ws(block=False)
+            self.fp.write(" ".join(parts))
+            self._after_block = False
+        if trailing:
+            self._ws = True
+
+    def _tag(self, tag: str) -> None:
+        match = _TAG_NAME_RE.match(tag)
+        name = match.group(1).lower() if match else ""
+        block = name in BLOCK_ELEMENTS
+        self._flush_ws(block)
+        self.fp.write(tag)
+        self._after_block = block
+        if name in RAW_ELEMENTS and not tag.startswith("</") and not tag.endswith("/>"):
+            self._raw_end = _RAW_END_RE[name]
+
+
+def minify_html(html: str) -> str:
+    buf = io.StringIO()
+    writer = MinifyingWriter(buf)
+    writer.write(html)
+    writer.close()
+    return buf.getvalue()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import io
+import os
+import threading
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any
+
+from htmlnode import SupportsWrite
+
+_CHUNK = 1 << 16
+
+
+def _same_contents(a: Path, b: Path) -> bool:
+    try:
+        if a.stat().st_size != b.stat().st_size:
+            return False
+        with a.open("rb") as fa, b.open("rb") as fb:
+            while True:
+                chunk = fa.read(_CHUNK)
+                if chunk != fb.read(_CHUNK):
+                    return False
+                if not chunk:
+                    return True
+    except FileNotFoundError:
+        return False
+
+
+class OutputFile:
+    # writes go to a temp file next to `path` that is renamed over it on
+    # success, so a server reading the site never sees a half-written page.
+    # With compare=True an identical existing file is left alone, keeping
+    # its mtime for rsync, object store sync and CDN purges.
+    def __init__(
+        self, path: Path, compare: bool = False, binary: bool = False
+    ) -> None:
+        self.path = path
+        self.compare = compare
+        self.binary = binary
+        # pid and thread keep concurrent writers apart; a leftover from a
+        # crashed build is simply truncated
+        self.tmp = path.with_name(
+            f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp"
+        )
+        self.changed: bool | None = None
+        self._fp: IO[Any] | None = None
+
+    def __enter__(self) -> IO[Any]:
+        # unlike mkstemp, the permissions follow the umask like a plain open
+        fd = os.open(self.tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        if self.binary:
+            self._fp = io.open(fd, "wb")
+        else:
+            self._fp = io.open(fd, "w", encoding="utf-8")
+        return self._fp
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        assert self._fp is not None
+        try:
+            self._fp.close()
+            if exc_type is None:
+                self.changed = not (
+                    self.compare and _same_contents(self.tmp, self.path)
+                )
+                if self.changed:
+                    os.replace(self.tmp, self.path)
+        finally:
+            if self.tmp.exists():
+                self.tmp.unlink()
+
+
+class TeeWriter:
+    # passes writes through to fp and keeps a copy, so the page can be
+    # post-processed (e.g. compressed) without reading the file back
+    def __init__(self, fp: SupportsWrite) -> None:
+        self.fp = fp
+        self.chunks: list[str] = []
+
+    def write(self, s: str) -> object:
+        self.chunks.append(s)
+        return self.fp.write(s)
+
+    def getvalue(self) -> str:
+        return "".join(self.chunks)
+
+
+def write_output(path: Path, text: str, compare: bool = False) -> bool:
+    # returns whether the file on disk changed
+    output = OutputFile(path, compare)
+    with output as fp:
+        fp.write(text)
+    return bool(output.changed)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping
+
+from block_cache import BlockCache
+from compress import Precompressor, precompress
+from htmlnode import HTMLNode, SupportsWrite
+from logger import logger
+from markdown_handler import parse_document, stream_markdown_file
+from minify import MinifyingWriter
+from output import OutputFile, TeeWriter
+from render_cache import RenderCache
+from search import page_terms
+from template import Template
+from tracing import span
+
+
+@dataclass
+class PageResult:
+    title: str
+    # whether the output file was (re)written
+    changed: bool
+    # the page's search terms, when asked for
+    terms: list[str] | None = None
+
+
+def generate_page(
+    from_path: Path,
+    template: Template,
+    dest_path: Path,
+    block_cache: BlockCache | None = None,
+    render_cache: RenderCache | None = None,
+    stream_threshold: int | None = None,
+    write_if_changed: bool = False,
+    compressor: Precompressor | None = None,
+    minify: bool = False,
+    search: bool = False,
+    asset_urls: Mapping[str, str] | None = None,
+) -> PageResult:
+    # with minify the template is expected to be minified already, and with
+    # asset_urls its references rewritten and the caches salted to match
+    # (see generate_pages_recursive)
+    logger.debug("generating page from '%s' to '%s'", from_path, dest_path)
+
+    output = OutputFile(dest_path, compare=write_if_changed)
+    if stream_threshold is not None and from_path.stat().st_size >= stream_threshold:
+        texts: list[str] | None = [] if search else None
+        title = _generate_page_streaming(
+            from_path, template, output, block_cache, minify, texts, asset_urls
+        )
+        # too big to keep around, the compressor reads it back in chunks
+        precompress(compressor, dest_path)
+        terms = page_terms(texts) if texts is not None else None
+        return PageResult(title, bool(output.changed), terms)
+
+    with span("generate_page", path=str(from_path)):
+        with span("read"):
+            md = from_path.read_text(encoding="utf-8")
+
+        title, body, terms = render_body(
+            md, block_cache, render_cache, search, asset_urls
+        )
+
+        # stream the tree into the file rather than building the page string;
+        # serialization, template fill and the write happen together here
+        with span("write_html"), output as fp:
+            # the compressor gets a copy of exactly what goes to disk
+            tee = TeeWriter(fp) if compressor is not None else None
+            sink: SupportsWrite = tee if tee is not None else fp
+            _render_into(sink, template, title, body, minify)
+        precompress(
+            compressor,
+            dest_path,
+            tee.getvalue().encode("utf-8") if tee is not None else None,
+        )
+    return PageResult(title, bool(output.changed), terms)
+
+
+def render_body(
+    md: str,
+    block_cache: BlockCache | None = None,
+    render_cache: RenderCache | None = None,
+    search: bool = False,
+    asset_urls: Mapping[str, str] | None = None,
+) -> tuple[str, str | HTMLNode, list[str] | None]:
+    # (title, body, search terms); the terms come out of the same parse
+    # and are cached with the page
+    cached = render_cache.get(md, search) if render_cache is not None else None
+    if cached is not None:
+        return cached
+
+    texts: list[str] | None = [] if search else None
+    doc = parse_document(md, block_cache, texts, asset_urls)
+    terms = page_terms(texts) if texts is not None else None
+    if render_cache is None:
+        return doc.title, doc.root, terms
+    with span("to_html"):
+        html = doc.root.to_html()
+    render_cache.put(md, doc.title, html, terms)
+    return doc.title, html, terms
+
+
+def render_page(
+    md: str,
+    template: Template,
+    block_cache: BlockCache | None = None,
+    render_cache: RenderCache | None = None,
+    search: bool = False,
+    asset_urls: Mapping[str, str] | None = None,
+) -> tuple[str, str, list[str] | None]:
+    # the title, whole page as a string and search terms, for callers that
+    # write it out themselves
+    title, body, terms = render_body(
+        md, block_cache, render_cache, search, asset_urls
+    )
+    buf = io.StringIO()
+    template.render(buf, {"Title": title, "Content": body})
+    return title, buf.getvalue(), terms
+
+
+def _generate_page_streaming(
+    from_path: Path,
+    template: Template,
+    output: OutputFile,
+    block_cache: BlockCache | None,
+    minify: bool = False,
+    texts: list[str] | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+) -> str:
+    # huge generated docs are parsed, rendered and written a block at a
+    # time; they skip the render cache, which needs the whole source
+    with span("generate_page", path=str(from_path), streamed=True):
+        title, body = stream_markdown_file(from_path, block_cache, texts, asset_urls)
+        with span("write_html"), output as fp:
+            _render_into(fp, template, title, body, minify)
+    return title
+
+
+def _render_into(
+    fp: SupportsWrite,
+    template: Template,
+    title: str,
+    body: str | HTMLNode,
+    minify: bool,
+) -> None:
+    if not minify:
+        template.render(fp, {"Title": title, "Content": body})
+        return
+    # minified on the way through, so the page is never held whole
+    writer = MinifyingWriter(fp)
+    template.render(writer, {"Title": title, "Content": body})
+    writer.close()
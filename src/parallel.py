@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Sequence
+
+import logger
+import tracing
+from block_cache import BlockCache
+from compress import Precompressor
+from page import PageResult, generate_page
+from render_cache import RenderCache
+from template import Template
+
+# set once per worker process by _init_worker
+_template: Template | None = None
+_block_cache: BlockCache | None = None
+_render_cache: RenderCache | None = None
+_stream_threshold: int | None = None
+_write_if_changed = False
+_compressor: Precompressor | None = None
+_minify = False
+_search = False
+_asset_urls: Mapping[str, str] = {}
+
+# block cache hits/misses, render cache hits/misses, compressed/up to date
+Counters = tuple[int, int, int, int, int, int]
+
+
+class BuildError(Exception):
+    def __init__(self, failures: list[tuple[Path, str]]) -> None:
+        self.failures = failures
+        lines = "\n".join(f"  {path}: {error}" for path, error in failures)
+        super().__init__(f"{len(failures)} page(s) failed to build:\n{lines}")
+
+
+def _init_worker(
+    template: Template,
+    trace: bool,
+    cache_limits: tuple[int, int | None] | None,
+    render_cache: RenderCache | None,
+    stream_threshold: int | None,
+    write_if_changed: bool,
+    log_settings: dict[str, Any] | None,
+    compress_min_size: int | None,
+    asset_urls: Mapping[str, str],
+    minify: bool,
+    search: bool,
+) -> None:
+    global _template, _block_cache, _render_cache, _compressor
+    global _stream_threshold, _write_if_changed, _minify, _search, _asset_urls
+    _template = template
+    _minify = minify
+    _search = search
+    # each worker's block cache starts empty and only ever sees this mapping
+    _asset_urls = asset_urls
+    _stream_threshold = stream_threshold
+    _write_if_changed = write_if_changed
+    # each worker keeps its own block cache; sharing one across processes
+    # would cost more than re-rendering a block
+    _block_cache = BlockCache(*cache_limits) if cache_limits is not None else None
+    _render_cache = render_cache
+    # the pool already keeps every core busy, so compress inline
+    _compressor = (
+        Precompressor(compress_min_size, jobs=0)
+        if compress_min_size is not None
+        else None
+    )
+    logger.configure_worker_logging(log_settings)
+    # a forked worker inherits the parent's recorded spans; start clean
+    tracing.disable()
+    if trace:
+        tracing.enable()
+
+
+def _counters() -> Counters:
+    block, render, compressor = _block_cache, _render_cache, _compressor
+    return (
+        block.hits if block is not None else 0,
+        block.misses if block is not None else 0,
+        render.hits if render is not None else 0,
+        render.misses if render is not None else 0,
+        compressor.compressed if compressor is not None else 0,
+        compressor.skipped if compressor is not None else 0,
+    )
+
+
+def _generate_page_safe(
+    paths: tuple[Path, Path]
+) -> tuple[str | None, PageResult | None, list[tracing.TraceEvent], Counters]:
+    from_path, dest_path = paths
+    assert _template is not None
+    before = _counters()
+    error = None
+    result = None
+    try:
+        result = generate_page(
+            from_path,
+            _template,
+            dest_path,
+            _block_cache,
+            _render_cache,
+            _stream_threshold,
+            _write_if_changed,
+            _compressor,
+            _minify,
+            _search,
+            _asset_urls,
+        )
+    except Exception as exc:
+        # report instead of raising so one bad page doesn't stop the pool
+        error = f"{type(exc).__name__}: {exc}"
+    after = _counters()
+    delta = (
+        after[0] - before[0],
+        after[1] - before[1],
+        after[2] - before[2],
+        after[3] - before[3],
+        after[4] - before[4],
+        after[5] - before[5],
+    )
+    # spans and cache counters from the worker travel back with the result
+    return error, result, tracing.drain(), delta
+
+
+def generate_pages_parallel(
+    pages: Sequence[tuple[Path, Path]],
+    template: Template,
+    jobs: int,
+    trace: bool = False,
+    block_cache: BlockCache | None = None,
+    render_cache: RenderCache | None = None,
+    stream_threshold: int | None = None,
+    write_if_changed: bool = False,
+    compressor: Precompressor | None = None,
+    asset_urls: Mapping[str, str] | None = None,
+    minify: bool = False,
+    search: bool = False,
+) -> Iterator[tuple[Path, str | None, PageResult | None]]:
+    if not pages:
+        return
+    chunksize = max(1, len(pages) // (jobs * 8))
+    cache_limits = (
+        (block_cache.max_bytes, block_cache.max_entries)
+        if block_cache is not None
+        else None
+    )
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(
+            template,
+            trace,
+            cache_limits,
+            render_cache,
+            stream_threshold,
+            write_if_changed,
+            logger.worker_settings(),
+            compressor.min_size if compressor is not None else None,
+            asset_urls or {},
+            minify,
+            search,
+        ),
+    ) as pool:
+        results = pool.map(_generate_page_safe, pages, chunksize=chunksize)
+        for (from_path, _), (error, result, events, delta) in zip(pages, results):
+            tracing.record(events)
+            if block_cache is not None:
+                block_cache.hits += delta[0]
+                block_cache.misses += delta[1]
+            if render_cache is not None:
+                render_cache.hits += delta[2]
+                render_cache.misses += delta[3]
+            if compressor is not None:
+                compressor.compressed += delta[4]
+                compressor.skipped += delta[5]
+            yield from_path, error, result
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from logger import logger
+from markdown_handler import RENDERER_VERSION
+
+
+class RenderCache:
+    # content-addressed directory of rendered pages keyed by a hash of the
+    # markdown source and renderer version. Entries are written to a temp
+    # file and renamed into place, so any number of processes can share
+    # one cache dir; the worst case of a race is rendering a page twice.
+    def __init__(
+        self, root: str | Path, max_bytes: int = 512 << 20, salt: str = ""
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        # anything else that changes rendered output, e.g. asset hashes
+        self.salt = salt
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, md: str) -> str:
+        digest = hashlib.sha256()
+        for part in (RENDERER_VERSION, self.salt, md):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:]
+
+    def get(
+        self, md: str, terms: bool = False
+    ) -> tuple[str, str, list[str] | None] | None:
+        # (title, html, search terms); with terms, an entry put without
+        # them counts as a miss
+        path = self._path(self.key(md))
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            entry = None
+        if entry is None or (terms and entry.get("terms") is None):
+            self.misses += 1
+            return None
+        # bump the mtime so pruning drops the least recently used first
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return entry["title"], entry["html"], entry.get("terms")
+
+    def put(
+        self, md: str, title: str, html: str, terms: list[str] | None = None
+    ) -> None:
+        path = self._path(self.key(md))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"title": title, "html": html, "terms": terms}, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self) -> list[tuple[Path, int, int]]:
+        entries = []
+        if not self.root.exists():
+            return entries
+        with os.scandir(self.root) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as files:
+                    for entry in files:
+                        if entry.name.startswith(".tmp-"):
+                            continue
+                        try:
+                            st = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append(
+                            (Path(entry.path), st.st_size, st.st_mtime_ns)
+                        )
+        return entries
+
+    def prune(self, max_bytes: int | None = None) -> tuple[int, int]:
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = freed = 0
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= limit:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                # another process pruned it first
+                pass
+            total -= size
+            removed += 1
+            freed += size
+        if removed:
+            logger.info("render cache: pruned %d entries, %d bytes", removed, freed)
+        return removed, freed
+
+    def __repr__(self) -> str:
+        return f"RenderCache({self.root}, {self.hits} hits, {self.misses} misses)"
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import heapq
+import json
+import re
+import zlib
+from pathlib import Path
+from typing import IO, Any, Iterable
+
+from compress import Precompressor, precompress
+from manifest import hash_bytes, sidecar_path
+from output import OutputFile
+from tracing import traced
+
+# terms are spread over this many files by hash, so a query fetches only
+# the shards of its own terms
+SHARDS = 64
+# page URLs and titles, by id, in files of this many
+DOCS_PER_FILE = 1000
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 32
+FORMAT_VERSION = 1
+
+_WORD_RE = re.compile(r"\w+")
+_COMPACT = (",", ":")
+
+
+def page_terms(texts: Iterable[str]) -> list[str]:
+    # the distinct words of a page's visible text, as collected from its
+    # text nodes while rendering (see parse_document)
+    terms: set[str] = set()
+    for text in texts:
+        terms.update(_WORD_RE.findall(text.casefold()))
+    # overlong words are hashes, numbers and the like that nobody will type
+    # into a search box
+    return sorted(
+        term for term in terms if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH
+    )
+
+
+def term_shard(term: str, shards: int = SHARDS) -> int:
+    # the site's search script has to do the same: crc32 of the UTF-8 bytes
+    return zlib.crc32(term.encode("utf-8")) % shards
+
+
+def delta_encode(ids: Iterable[int]) -> list[int]:
+    # sorted ids -> gaps, which are small numbers and compress well
+    out: list[int] = []
+    previous = 0
+    for doc_id in ids:
+        out.append(doc_id - previous)
+        previous = doc_id
+    return out
+
+
+def delta_decode(gaps: Iterable[int]) -> list[int]:
+    out: list[int] = []
+    doc_id = 0
+    for gap in gaps:
+        doc_id += gap
+        out.append(doc_id)
+    return out
+
+
+def _write_json(
+    path: Path,
+    data: Any,
+    write_if_changed: bool,
+    compressor: Precompressor | None,
+) -> None:
+    output = OutputFile(path, compare=write_if_changed)
+    with output as fp:
+        json.dump(data, fp, separators=_COMPACT, ensure_ascii=False, sort_keys=True)
+    precompress(compressor, path)
+
+
+class SearchIndex:
+    # an inverted index under public/search/ for a static search page:
+    # terms-XX.json maps each term of shard XX to delta-encoded page ids and
+    # docs-N.json lists [url, title] by id. Pages keep their id across
+    # builds, so a changed page only rewrites the shards its old and new
+    # terms fall in. Terms arriving during the build are spilled to disk by
+    # shard and shards are rebuilt one at a time, so memory holds about one
+    # shard's postings rather than the whole site's.
+    def __init__(self, public_dir: Path, shards: int = SHARDS) -> None:
+        self.out_dir = public_dir / "search"
+        self.shards = shards
+        self.state_path = sidecar_path(public_dir, "search")
+        # per shard, the terms each page has there
+        self.state_dir = public_dir.with_name(f"{public_dir.name}.search")
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            state = {}
+        self._reset = (
+            state.get("version") != FORMAT_VERSION or state.get("shards") != shards
+        )
+        # source -> [id, url, title, hash of its terms, bitmask of its shards]
+        self.pages: dict[str, list[Any]] = {} if self._reset else state["pages"]
+
+        used = {entry[0] for entry in self.pages.values()}
+        self._next_id = max(used, default=-1) + 1
+        self._free = [i for i in range(self._next_id) if i not in used]
+        self._seen: set[str] = set()
+        # pages whose terms changed; their old per-shard terms are dropped
+        self._updated: set[str] = set()
+        self._dirty_shards: set[int] = set(range(shards)) if self._reset else set()
+        self._dirty_docs: set[int] = set()
+        self._spills: dict[int, IO[str]] = {}
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        for leftover in self.state_dir.glob("*.jsonl"):
+            # from a build that didn't get to write()
+            leftover.unlink()
+        if self._reset:
+            for old in self.state_dir.glob("*.json"):
+                old.unlink()
+
+    def keep(self, source: str) -> bool:
+        # the page wasn't rebuilt, so whatever the index has for it stays;
+        # False if that's nothing and the caller has to add() it after all
+        self._seen.add(source)
+        return source in self.pages
+
+    def add(self, source: str, url: str, title: str, terms: list[str]) -> None:
+        self._seen.add(source)
+        terms_hash = hash_bytes("\n".join(terms).encode("utf-8"))
+        entry = self.pages.get(source)
+        if entry is not None and entry[3] == terms_hash:
+            if entry[1:3] != [url, title]:
+                entry[1:3] = [url, title]
+                self._dirty_docs.add(entry[0] // DOCS_PER_FILE)
+            return
+
+        by_shard: dict[int, list[str]] = {}
+        for term in terms:
+            by_shard.setdefault(term_shard(term, self.shards), []).append(term)
+        mask = sum(1 << shard for shard in by_shard)
+        if entry is None:
+            doc_id = heapq.heappop(self._free) if self._free else self._take_id()
+        else:
+            doc_id = entry[0]
+            self._dirty_shards.update(_mask_shards(entry[4]))
+            self._updated.add(source)
+        self.pages[source] = [doc_id, url, title, terms_hash, mask]
+        self._dirty_docs.add(doc_id // DOCS_PER_FILE)
+        self._dirty_shards.update(by_shard)
+        for shard, shard_terms in by_shard.items():
+            spill = self._spills.get(shard)
+            if spill is None:
+                spill = self._spills[shard] = open(
+                    self.state_dir / f"{shard:02x}.jsonl", "w", encoding="utf-8"
+                )
+            spill.write(json.dumps([source, shard_terms], separators=_COMPACT))
+            spill.write("\n")
+
+    def _take_id(self) -> int:
+        doc_id = self._next_id
+        self._next_id += 1
+        return doc_id
+
+    @traced("search_index")
+    def write(
+        self, write_if_changed: bool = False, compressor: Precompressor | None = None
+    ) -> int:
+        # drops pages that weren't kept or added this build and writes out
+        # what changed; returns the number of term shards rewritten
+        for source in [s for s in self.pages if s not in self._seen]:
+            doc_id, _, _, _, mask = self.pages.pop(source)
+            heapq.heappush(self._free, doc_id)
+            self._dirty_docs.add(doc_id // DOCS_PER_FILE)
+            self._dirty_shards.update(_mask_shards(mask))
+        for spill in self._spills.values():
+            spill.close()
+        self._spills.clear()
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        if self._reset:
+            for old in self.out_dir.glob("terms-*.json"):
+                if int(old.stem.partition("-")[2], 16) >= self.shards:
+                    old.unlink()
+        # a full build wipes public/ but not the state next to it, so
+        # anything no longer on disk is written again from that state
+        self._dirty_shards.update(
+            shard
+            for shard in range(self.shards)
+            if not (self.out_dir / f"terms-{shard:02x}.json").exists()
+        )
+        for shard in sorted(self._dirty_shards):
+            self._write_shard(shard, write_if_changed, compressor)
+        self._write_docs(write_if_changed, compressor)
+        _write_json(
+            self.out_dir / "meta.json",
+            {
+                "version": FORMAT_VERSION,
+                "shards": self.shards,
+                "shard_hash": "crc32",
+                "docs_per_file": DOCS_PER_FILE,
+                "min_term_length": MIN_TERM_LENGTH,
+                "max_term_length": MAX_TERM_LENGTH,
+                "pages": len(self.pages),
+            },
+            write_if_changed,
+            compressor,
+        )
+
+        state = {"version": FORMAT_VERSION, "shards": self.shards, "pages": self.pages}
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp.write_text(json.dumps(state, separators=_COMPACT), encoding="utf-8")
+        tmp.replace(self.state_path)
+        rewritten = len(self._dirty_shards)
+        self._dirty_shards.clear()
+        self._dirty_docs.clear()
+        self._updated.clear()
+        self._seen.clear()
+        self._reset = False
+        return rewritten
+
+    def _write_shard(
+        self, shard: int, write_if_changed: bool, compressor: Precompressor | None
+    ) -> None:
+        name = f"{shard:02x}"
+        state_file = self.state_dir / f"{name}.json"
+        try:
+            previous = json.loads(state_file.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            previous = {}
+        page_terms: dict[str, list[str]] = {
+            source: terms
+            for source, terms in previous.items()
+            if source in self.pages and source not in self._updated
+        }
+        spill = self.state_dir / f"{name}.jsonl"
+        if spill.exists():
+            with spill.open(encoding="utf-8") as f:
+                for line in f:
+                    source, terms = json.loads(line)
+                    page_terms[source] = terms
+            spill.unlink()
+
+        postings: dict[str, list[int]] = {}
+        for source, terms in page_terms.items():
+            doc_id = self.pages[source][0]
+            for term in terms:
+                postings.setdefault(term, []).append(doc_id)
+        _write_json(
+            self.out_dir / f"terms-{name}.json",
+            {term: delta_encode(sorted(ids)) for term, ids in postings.items()},
+            write_if_changed,
+            compressor,
+        )
+        state_file.write_text(
+            json.dumps(page_terms, separators=_COMPACT, sort_keys=True),
+            encoding="utf-8",
+        )
+
+    def _write_docs(
+        self, write_if_changed: bool, compressor: Precompressor | None
+    ) -> None:
+        last_id = max((entry[0] for entry in self.pages.values()), default=-1)
+        files = last_id // DOCS_PER_FILE
+        dirty = set(range(files + 1)) if self._reset else set(self._dirty_docs)
+        dirty.update(
+            n
+            for n in range(files + 1)
+            if not (self.out_dir / f"docs-{n}.json").exists()
+        )
+        for old in self.out_dir.glob("docs-*.json"):
+            if int(old.stem.partition("-")[2]) > files:
+                old.unlink()
+        if not dirty:
+            return
+
+        docs: dict[int, list[list[str] | None]] = {
+            n: [None] * DOCS_PER_FILE for n in dirty if n <= files
+        }
+        for doc_id, url, title, _, _ in self.pages.values():
+            slots = docs.get(doc_id // DOCS_PER_FILE)
+            if slots is not None:
+                slots[doc_id % DOCS_PER_FILE] = [url, title]
+        for n, slots in docs.items():
+            while slots and slots[-1] is None:
+                slots.pop()
+            _write_json(
+                self.out_dir / f"docs-{n}.json", slots, write_if_changed, compressor
+            )
+
+
+def _mask_shards(mask: int) -> Iterable[int]:
+    shard = 0
+    while mask:
+        if mask & 1:
+            yield shard
+        mask >>= 1
+        shard += 1
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from fastcopy import copy_files, same_filesystem
+from logger import logger
+from manifest import BuildManifest, manifest_path
+from markdown_handler import RENDERER_VERSION
+from utils import walk_tree
+
+
+class MergeError(Exception):
+    pass
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    # "2/4" -> (2, 4); shards count from 1
+    index, sep, count = spec.partition("/")
+    try:
+        shard = int(index), int(count)
+    except ValueError:
+        shard = (0, 0)
+    if not sep or not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"expected I/N with 1 <= I <= N, e.g. 1/4, got {spec!r}")
+    return shard
+
+
+def shard_dir(public_dir: Path, index: int) -> Path:
+    # public.shard-2 next to public/, for merge to pick up
+    return public_dir.with_name(f"{public_dir.name}.shard-{index}")
+
+
+def page_shard(rel: str, count: int) -> int:
+    # rendezvous hashing: the shard (1 to count) scoring highest for the path.
+    # Nothing but the path counts, not even sizes, so editing or adding a page
+    # never moves another one to a machine whose --incremental state lacks it;
+    # going from N to N+1 shards only moves pages onto the new shard
+    def score(shard: int) -> bytes:
+        return hashlib.sha256(f"{shard}/{rel}".encode("utf-8")).digest()
+
+    return max(range(1, count + 1), key=score)
+
+
+def partition(rels: Iterable[str], count: int) -> dict[str, int]:
+    return {rel: page_shard(rel, count) for rel in rels}
+
+
+def shard_pages(
+    md_paths: Sequence[Path], content_dir: Path, shard: tuple[int, int]
+) -> list[Path]:
+    index, count = shard
+    return [
+        path
+        for path in md_paths
+        if page_shard(path.relative_to(content_dir).as_posix(), count) == index
+    ]
+
+
+def _load_shard_manifest(shard: Path) -> dict[str, Any]:
+    path = manifest_path(shard)
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise MergeError(f"{shard} has no build manifest ({path})") from None
+
+
+def merge_shards(
+    shard_dirs: Sequence[Path], public_dir: Path, link: bool = False
+) -> BuildManifest:
+    # copies (or hardlinks) every shard's output into a fresh public_dir and
+    # writes the combined manifest; fails before touching public_dir if two
+    # shards produced the same file or page
+    template_hash: str | None = None
+    pages: dict[str, dict[str, Any]] = {}
+    page_owner: dict[str, Path] = {}
+    file_owner: dict[str, Path] = {}
+    to_copy: list[tuple[str, str, int]] = []
+    conflicts: list[str] = []
+
+    for shard in shard_dirs:
+        data = _load_shard_manifest(shard)
+        if data.get("renderer_version") != RENDERER_VERSION or (
+            template_hash is not None and data.get("template_hash") != template_hash
+        ):
+            raise MergeError(
+                f"{shard} was built with a different template or renderer version"
+            )
+        template_hash = data["template_hash"]
+
+        for source, entry in data["pages"].items():
+            if source in page_owner:
+                conflicts.append(f"page {source}: {page_owner[source]} and {shard}")
+                continue
+            page_owner[source] = shard
+            # outputs are relative to the shard, so they carry over as is
+            pages[source] = entry
+
+        # a shard that got no pages may never have created its directory
+        files = walk_tree(str(shard))[0] if shard.is_dir() else {}
+        for rel, st in files.items():
+            if rel in file_owner:
+                conflicts.append(f"{rel}: {file_owner[rel]} and {shard}")
+                continue
+            file_owner[rel] = shard
+            to_copy.append((str(shard / rel), str(public_dir / rel), st.st_size))
+
+    if conflicts:
+        lines = "\n".join(f"  {conflict}" for conflict in conflicts)
+        raise MergeError(
+            f"{len(conflicts)} path(s) claimed by more than one shard:\n{lines}"
+        )
+    assert template_hash is not None
+
+    if public_dir.exists():
+        shutil.rmtree(public_dir)
+    public_dir.mkdir(parents=True)
+    for parent in {Path(dest).parent for _, dest, _ in to_copy}:
+        parent.mkdir(parents=True, exist_ok=True)
+    if link and to_copy and not same_filesystem(to_copy[0][0], str(public_dir)):
+        logger.warning("shards and %s are on different filesystems", public_dir)
+        link = False
+    copy_files(to_copy, link=link)
+
+    manifest = BuildManifest(public_dir, template_hash, pages)
+    manifest.save()
+    logger.info(
+        "merged %d shard(s): %d files, %d pages",
+        len(shard_dirs),
+        len(to_copy),
+        len(pages),
+    )
+    return manifest
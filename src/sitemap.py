@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Sequence
+from urllib.parse import quote
+from xml.sax.saxutils import escape, quoteattr
+
+from compress import Precompressor, precompress, remove_siblings
+from output import OutputFile
+from tracing import traced
+
+# the most URLs sitemaps.org allows in one file; bigger sites get an index
+# pointing at numbered shards
+SITEMAP_LIMIT = 50_000
+FEED_ENTRIES = 20
+
+_SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+_ATOM_NS = "http://www.w3.org/2005/Atom"
+_XML_DECL = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+
+@dataclass
+class PageEntry:
+    url: str
+    title: str
+    # of the source, so lastmod doesn't move when only the build reruns
+    mtime: float
+
+
+def page_url(base_url: str, public_dir: Path, output: Path) -> str:
+    # public/blog/index.html -> https://example.com/blog/
+    rel = output.relative_to(public_dir).as_posix()
+    if rel == "index.html" or rel.endswith("/index.html"):
+        rel = rel[: -len("index.html")]
+    return f"{base_url.rstrip('/')}/{quote(rel)}"
+
+
+def _timestamp(mtime: float) -> str:
+    return datetime.fromtimestamp(mtime, timezone.utc).isoformat(timespec="seconds")
+
+
+def _write_xml(
+    path: Path,
+    lines: Iterable[str],
+    write_if_changed: bool,
+    compressor: Precompressor | None,
+) -> None:
+    output = OutputFile(path, compare=write_if_changed)
+    with output as fp:
+        fp.write(_XML_DECL)
+        for line in lines:
+            fp.write(line)
+    precompress(compressor, path)
+
+
+def _urlset(pages: Sequence[PageEntry]) -> Iterable[str]:
+    yield f'<urlset xmlns="{_SITEMAP_NS}">\n'
+    for page in pages:
+        yield (
+            f"<url><loc>{escape(page.url)}</loc>"
+            f"<lastmod>{_timestamp(page.mtime)}</lastmod></url>\n"
+        )
+    yield "</urlset>\n"
+
+
+def _sitemap_index(
+    base_url: str, shards: Sequence[tuple[Path, Sequence[PageEntry]]]
+) -> Iterable[str]:
+    yield f'<sitemapindex xmlns="{_SITEMAP_NS}">\n'
+    for path, pages in shards:
+        lastmod = max(page.mtime for page in pages)
+        yield (
+            f"<sitemap><loc>{escape(page_url(base_url, path.parent, path))}</loc>"
+            f"<lastmod>{_timestamp(lastmod)}</lastmod></sitemap>\n"
+        )
+    yield "</sitemapindex>\n"
+
+
+@traced("write_sitemaps")
+def write_sitemaps(
+    public_dir: Path,
+    base_url: str,
+    pages: Iterable[PageEntry],
+    write_if_changed: bool = False,
+    compressor: Precompressor | None = None,
+) -> list[Path]:
+    # returns the files written: sitemap.xml, plus sitemap-N.xml shards
+    # once there are more than SITEMAP_LIMIT pages
+    ordered = sorted(pages, key=lambda page: page.url)
+    index = public_dir / "sitemap.xml"
+    if len(ordered) <= SITEMAP_LIMIT:
+        _write_xml(index, _urlset(ordered), write_if_changed, compressor)
+        shards: list[tuple[Path, Sequence[PageEntry]]] = []
+    else:
+        shards = [
+            (public_dir / f"sitemap-{n}.xml", ordered[start : start + SITEMAP_LIMIT])
+            for n, start in enumerate(range(0, len(ordered), SITEMAP_LIMIT), 1)
+        ]
+        for path, chunk in shards:
+            _write_xml(path, _urlset(chunk), write_if_changed, compressor)
+        _write_xml(
+            index, _sitemap_index(base_url, shards), write_if_changed, compressor
+        )
+
+    # shards left over from when the site was bigger
+    current = {path for path, _ in shards}
+    for stale in public_dir.glob("sitemap-*.xml"):
+        if stale not in current:
+            stale.unlink()
+            remove_siblings(stale)
+    return [index, *(path for path, _ in shards)]
+
+
+def _feed(base_url: str, title: str, recent: Sequence[PageEntry]) -> Iterable[str]:
+    root = base_url.rstrip("/") + "/"
+    updated = _timestamp(recent[0].mtime if recent else 0)
+    yield f'<feed xmlns="{_ATOM_NS}">\n'
+    yield f"<title>{escape(title)}</title>\n"
+    yield f"<id>{escape(root)}</id>\n"
+    yield f"<link href={quoteattr(root)}/>\n"
+    yield f'<link rel="self" href={quoteattr(root + "feed.xml")}/>\n'
+    yield f"<updated>{updated}</updated>\n"
+    yield f"<author><name>{escape(title)}</name></author>\n"
+    for page in recent:
+        yield (
+            f"<entry><title>{escape(page.title)}</title>"
+            f"<id>{escape(page.url)}</id><link href={quoteattr(page.url)}/>"
+            f"<updated>{_timestamp(page.mtime)}</updated></entry>\n"
+        )
+    yield "</feed>\n"
+
+
+@traced("write_feed")
+def write_feed(
+    public_dir: Path,
+    base_url: str,
+    pages: Iterable[PageEntry],
+    write_if_changed: bool = False,
+    compressor: Precompressor | None = None,
+    limit: int = FEED_ENTRIES,
+) -> Path:
+    # an Atom feed of the most recently changed pages, titled after the
+    # home page
+    pages = list(pages)
+    root = base_url.rstrip("/") + "/"
+    title = next((page.title for page in pages if page.url == root), root)
+    recent = heapq.nsmallest(limit, pages, key=lambda page: (-page.mtime, page.url))
+    path = public_dir / "feed.xml"
+    _write_xml(path, _feed(base_url, title, recent), write_if_changed, compressor)
+    return path
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Mapping
+
+from htmlnode import HTMLNode, SupportsWrite
+
+# any {{ Name }} is a slot; these are filled per page, the rest once per
+# build with fill()
+PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+PAGE_SLOTS = ("Title", "Content")
+_SLOT_MARK = "\0"
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class Template:
+    def __init__(self, segments: list[str], slots: list[str]) -> None:
+        # static text alternates with slots: segments[i] precedes slots[i]
+        if len(segments) != len(slots) + 1:
+            raise ValueError("a template needs exactly one more segment than slots")
+        self.segments = segments
+        self.slots = slots
+
+    def fill(self, **values: str) -> Template:
+        # fold build-wide values into the static text once, not per page
+        segments = [self.segments[0]]
+        slots: list[str] = []
+        for name, segment in zip(self.slots, self.segments[1:]):
+            if name in values:
+                segments[-1] += values[name] + segment
+            else:
+                slots.append(name)
+                segments.append(segment)
+        return Template(segments, slots)
+
+    def map_static(self, fn: Callable[[str], str]) -> Template:
+        # e.g. rewrite asset URLs in the markup around the placeholders
+        return Template([fn(segment) for segment in self.segments], self.slots)
+
+    def transform(self, fn: Callable[[str], str]) -> Template:
+        # like map_static, but fn sees the whole page with the slots marked,
+        # for rewrites that depend on what's around each segment
+        if any(_SLOT_MARK in segment for segment in self.segments):
+            raise TemplateError("template contains a NUL character")
+        segments = fn(_SLOT_MARK.join(self.segments)).split(_SLOT_MARK)
+        if len(segments) != len(self.segments):
+            raise TemplateError("transform added or removed a placeholder")
+        return Template(segments, self.slots)
+
+    def render(
+        self, fp: SupportsWrite, values: Mapping[str, str | HTMLNode]
+    ) -> None:
+        write = fp.write
+        write(self.segments[0])
+        for name, segment in zip(self.slots, self.segments[1:]):
+            try:
+                value = values[name]
+            except KeyError:
+                raise TemplateError(f"no value for placeholder {{{{ {name} }}}}")
+            if isinstance(value, str):
+                write(value)
+            else:
+                value.write_html(fp)
+            write(segment)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Template):
+            return NotImplemented
+        return self.segments == other.segments and self.slots == other.slots
+
+    def __repr__(self) -> str:
+        return f"Template({self.segments}, {self.slots})"
+
+
+def compile_template(source: str, known: Iterable[str] | None = None) -> Template:
+    # with known, any other name is an error here rather than on every page
+    names = None if known is None else frozenset(known)
+    segments: list[str] = []
+    slots: list[str] = []
+    pos = 0
+    for match in PLACEHOLDER_RE.finditer(source):
+        name = match.group(1)
+        if names is not None and name not in names:
+            line = source.count("\n", 0, match.start()) + 1
+            raise TemplateError(
+                f"unknown placeholder {match.group(0)!r} on line {line}, "
+                f"expected one of {', '.join(sorted(names))}"
+            )
+        segments.append(source[pos : match.start()])
+        slots.append(name)
+        pos = match.end()
+    segments.append(source[pos:])
+    return Template(segments, slots)
+
+
+def compile_page_template(source: str, **values: str) -> Template:
+    # a page template: values are filled in for the whole build, and anything
+    # that's neither one of them nor a per-page slot fails now
+    return compile_template(source, known=[*values, *PAGE_SLOTS]).fill(**values)
+
+
+def load_template(path: str | Path, known: Iterable[str] | None = None) -> Template:
+    return compile_template(Path(path).read_text(encoding="utf-8"), known)
+
+
+def build_time() -> str:
+    # honour SOURCE_DATE_EPOCH so builds can be reproduced byte for byte
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    now = (
+        datetime.fromtimestamp(int(epoch), timezone.utc)
+        if epoch
+        else datetime.now(timezone.utc)
+    )
+    return now.isoformat(timespec="seconds")
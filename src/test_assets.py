@@ -0,0 +1,145 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import assets
+from assets import fingerprint_assets, hashed_name, rewrite_asset_urls
+from block_cache import BlockCache
+from main import generate_pages_recursive
+from utils import copy_static
+
+
+class TestAssets(unittest.TestCase):
+    def _static(self, root: Path) -> tuple[Path, Path]:
+        static = root / "static"
+        public = root / "public"
+        (static / "images").mkdir(parents=True)
+        (static / "index.css").write_text("body {}", encoding="utf-8")
+        (static / "images" / "cat.png").write_bytes(b"\x89PNG cat")
+        (static / "robots.txt").write_text("User-agent: *", encoding="utf-8")
+        return static, public
+
+    def test_hashed_name(self):
+        self.assertEqual(hashed_name("a/b.min.js", "3f2a9c1b77"), "a/b.min.3f2a9c1b.js")
+
+    def test_rewrite_asset_urls(self):
+        html = '<link href="/index.css"><img src=\'/a.png\'><a href="/other.css">'
+        urls = {"/index.css": "/index.1.css", "/a.png": "/a.2.png"}
+        self.assertEqual(
+            rewrite_asset_urls(html, urls),
+            '<link href="/index.1.css"><img src=\'/a.2.png\'><a href="/other.css">',
+        )
+        html = '<img data-src="/a.png" data-href="/index.css">'
+        self.assertEqual(rewrite_asset_urls(html, urls), html)
+
+    def test_fingerprint_assets_links_hashed_copies(self):
+        with tempfile.TemporaryDirectory() as td:
+            static, public = self._static(Path(td))
+            copy_static(str(static), str(public), sync=True)
+            urls = fingerprint_assets(str(static), str(public))
+
+            self.assertEqual(sorted(urls), ["/images/cat.png", "/index.css"])
+            hashed = public / urls["/index.css"].lstrip("/")
+            self.assertEqual(hashed.read_text(encoding="utf-8"), "body {}")
+            # the plain name stays for references that aren't rewritten
+            self.assertTrue((public / "index.css").exists())
+            self.assertTrue((public / "robots.txt").exists())
+
+    def test_unchanged_assets_are_not_rehashed(self):
+        with tempfile.TemporaryDirectory() as td:
+            static, public = self._static(Path(td))
+            copy_static(str(static), str(public), sync=True)
+            first = fingerprint_assets(str(static), str(public))
+
+            file_hash = mock.patch.object(assets, "file_hash", wraps=assets.file_hash)
+            with file_hash as fh:
+                self.assertEqual(fingerprint_assets(str(static), str(public)), first)
+                fh.assert_not_called()
+
+                (static / "index.css").write_text("body { x: 0 }", encoding="utf-8")
+                copy_static(str(static), str(public), sync=True)
+                second = fingerprint_assets(str(static), str(public))
+                self.assertEqual(fh.call_count, 1)
+
+            self.assertNotEqual(first["/index.css"], second["/index.css"])
+            self.assertFalse((public / first["/index.css"].lstrip("/")).exists())
+            self.assertTrue((public / second["/index.css"].lstrip("/")).exists())
+
+    def test_pages_reference_hashed_assets(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            static, public = self._static(root)
+            content = root / "content"
+            content.mkdir()
+            (content / "index.md").write_text(
+                "# Home\n\n![cat](/images/cat.png)", encoding="utf-8"
+            )
+            template = root / "template.html"
+            template.write_text(
+                '<link href="/index.css" />{{ Title }}{{ Content }}', encoding="utf-8"
+            )
+            copy_static(str(static), str(public), sync=True)
+            urls = fingerprint_assets(str(static), str(public))
+
+            for jobs in (1, 2):
+                generate_pages_recursive(
+                    content, template, public, jobs=jobs, asset_urls=urls
+                )
+                html = (public / "index.html").read_text(encoding="utf-8")
+                self.assertIn(f'href="{urls["/index.css"]}"', html)
+                self.assertIn(f'src="{urls["/images/cat.png"]}"', html)
+
+            # a build without fingerprinting goes back to the plain names
+            generate_pages_recursive(content, template, public)
+            html = (public / "index.html").read_text(encoding="utf-8")
+            self.assertIn('src="/images/cat.png"', html)
+
+    def test_incremental_build_rerenders_when_assets_change(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content = root / "content"
+            content.mkdir()
+            (content / "index.md").write_text("# H\n\n![x](/x.png)", encoding="utf-8")
+            template = root / "template.html"
+            template.write_text("{{ Content }}", encoding="utf-8")
+            public = root / "public"
+
+            for version in (1, 2):
+                summary = generate_pages_recursive(
+                    content,
+                    template,
+                    public,
+                    incremental=True,
+                    asset_urls={"/x.png": f"/x.{version}.png"},
+                )
+            self.assertEqual(summary.rewritten, 1)
+            html = (public / "index.html").read_text(encoding="utf-8")
+            self.assertIn("/x.2.png", html)
+
+    def test_block_cache_is_salted_with_asset_urls(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content = root / "content"
+            content.mkdir()
+            (content / "index.md").write_text("# H\n\n![x](/x.png)", encoding="utf-8")
+            template = root / "template.html"
+            template.write_text("{{ Content }}", encoding="utf-8")
+            cache = BlockCache()
+
+            for version in (1, 2):
+                generate_pages_recursive(
+                    content,
+                    template,
+                    root / f"public{version}",
+                    block_cache=cache,
+                    asset_urls={"/x.png": f"/x.{version}.png"},
+                )
+                html = (root / f"public{version}" / "index.html").read_text(
+                    encoding="utf-8"
+                )
+                self.assertIn(f"/x.{version}.png", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from block_cache import BlockCache
+from markdown_handler import markdown_to_html_node
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_get_put_counts_hits_and_misses(self):
+        cache = BlockCache()
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "<p>a</p>")
+        self.assertEqual(cache.get("a"), "<p>a</p>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used_by_entries(self):
+        cache = BlockCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_evicts_by_bytes(self):
+        cache = BlockCache(max_bytes=400)
+        for name in "abcdef":
+            cache.put(name, name * 100)
+
+        self.assertLessEqual(cache.bytes, 400)
+        self.assertIn("f", cache)
+        self.assertNotIn("a", cache)
+
+    def test_oversized_entry_is_not_cached(self):
+        cache = BlockCache(max_bytes=100)
+        cache.put("a", "x" * 1000)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.bytes, 0)
+
+    def test_replacing_entry_keeps_byte_count(self):
+        cache = BlockCache()
+        cache.put("a", "short")
+        cache.put("a", "short")
+        self.assertEqual(cache.bytes, BlockCache._size("a", "short"))
+
+    def test_cached_render_matches_uncached(self):
+        md = "# Title\n\n- shared **list**\n- of items\n\nA [link](/x) here"
+        cache = BlockCache()
+        expected = markdown_to_html_node(md).to_html()
+
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
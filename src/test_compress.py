@@ -0,0 +1,135 @@
+import gzip
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from compress import ENCODINGS, Precompressor, sibling
+from main import generate_pages_recursive
+from utils import copy_static
+
+
+class TestPrecompressor(unittest.TestCase):
+    def test_page_siblings_match_output(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content = root / "content"
+            content.mkdir()
+            body = "\n\n".join(f"paragraph {i} with some words" for i in range(100))
+            (content / "index.md").write_text(f"# Home\n\n{body}", encoding="utf-8")
+            (content / "tiny.md").write_text("# Tiny", encoding="utf-8")
+            template = root / "template.html"
+            template.write_text("{{ Title }}{{ Content }}", encoding="utf-8")
+
+            for jobs, io_jobs in [(1, 0), (2, 0), (1, 2)]:
+                public = root / f"public-{jobs}-{io_jobs}"
+                compressor = Precompressor(min_size=512, jobs=2)
+                generate_pages_recursive(
+                    content,
+                    template,
+                    public,
+                    jobs=jobs,
+                    io_jobs=io_jobs,
+                    compressor=compressor,
+                )
+                compressor.close()
+
+                page = public / "index.html"
+                self.assertEqual(compressor.compressed, 1)
+                self.assertEqual(
+                    gzip.decompress(sibling(page, ".gz").read_bytes()),
+                    page.read_bytes(),
+                )
+                self.assertFalse(sibling(public / "tiny.html", ".gz").exists())
+
+    def test_gzip_output_is_reproducible(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "app.js"
+            path.write_bytes(b"console.log(1);\n" * 200)
+            outputs = []
+            for _ in range(2):
+                compressor = Precompressor(min_size=0, jobs=0)
+                os.utime(path)
+                compressor.add(path)
+                outputs.append(sibling(path, ".gz").read_bytes())
+            self.assertEqual(outputs[0], outputs[1])
+
+    def test_up_to_date_siblings_are_skipped(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "style.css"
+            path.write_bytes(b"body { color: red }\n" * 100)
+
+            compressor = Precompressor(min_size=0, jobs=0)
+            compressor.add(path)
+            compressor.add(path)
+            self.assertEqual((compressor.compressed, compressor.skipped), (1, 1))
+
+            os.utime(path, ns=(1, 1))
+            compressor.add(path)
+            self.assertEqual(compressor.compressed, 2)
+            for suffix in ENCODINGS:
+                self.assertEqual(sibling(path, suffix).stat().st_mtime_ns, 1)
+
+    def test_rewrite_keeping_the_mtime_is_not_fresh(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "style.css"
+            path.write_bytes(b"body { color: red }\n" * 100)
+            compressor = Precompressor(min_size=0, jobs=0)
+            compressor.add(path)
+
+            st = path.stat()
+            path.write_bytes(b"body { color: blue }\n" * 100)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            compressor.add(path)
+
+            self.assertEqual(compressor.compressed, 2)
+            self.assertEqual(
+                gzip.decompress(sibling(path, ".gz").read_bytes()), path.read_bytes()
+            )
+
+    def test_build_without_precompress_drops_old_siblings(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content = root / "content"
+            content.mkdir()
+            body = "\n\n".join(f"paragraph {i} with some words" for i in range(100))
+            (content / "index.md").write_text(f"# Home\n\n{body}", encoding="utf-8")
+            template = root / "template.html"
+            template.write_text("{{ Title }}{{ Content }}", encoding="utf-8")
+            public = root / "public"
+            compressor = Precompressor(min_size=0, jobs=0)
+            generate_pages_recursive(
+                content, template, public, incremental=True, compressor=compressor
+            )
+            self.assertTrue(sibling(public / "index.html", ".gz").exists())
+
+            summary = generate_pages_recursive(
+                content, template, public, incremental=True
+            )
+
+            self.assertEqual(summary.skipped, 0)
+            for suffix in ENCODINGS:
+                self.assertFalse(sibling(public / "index.html", suffix).exists())
+
+    def test_static_files_get_siblings_and_lose_them_when_removed(self):
+        with tempfile.TemporaryDirectory() as td:
+            static = Path(td) / "static"
+            public = Path(td) / "public"
+            static.mkdir()
+            (static / "app.js").write_bytes(b"let x = 1;\n" * 200)
+            (static / "logo.png").write_bytes(b"\x89PNG" * 500)
+
+            compressor = Precompressor(min_size=100, jobs=2)
+            copy_static(str(static), str(public), sync=True, compressor=compressor)
+            compressor.wait()
+            self.assertTrue(sibling(public / "app.js", ".gz").exists())
+            self.assertFalse(sibling(public / "logo.png", ".gz").exists())
+
+            (static / "app.js").unlink()
+            copy_static(str(static), str(public), sync=True, compressor=compressor)
+            compressor.close()
+            self.assertFalse(sibling(public / "app.js", ".gz").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
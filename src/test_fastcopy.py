@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from fastcopy import copy_file, copy_files
+
+
+class TestFastCopy(unittest.TestCase):
+    def test_copy_file_preserves_content_and_mtime(self):
+        with tempfile.TemporaryDirectory() as td:
+            src = Path(td) / "src.bin"
+            dst = Path(td) / "dst.bin"
+            data = os.urandom(3 << 20)
+            src.write_bytes(data)
+
+            copy_file(str(src), str(dst), len(data))
+
+            self.assertEqual(dst.read_bytes(), data)
+            self.assertEqual(src.stat().st_mtime_ns, dst.stat().st_mtime_ns)
+
+    def test_copy_file_does_not_write_through_hardlink(self):
+        with tempfile.TemporaryDirectory() as td:
+            src = Path(td) / "src.txt"
+            other = Path(td) / "other.txt"
+            dst = Path(td) / "dst.txt"
+            src.write_text("source", encoding="utf-8")
+            other.write_text("other", encoding="utf-8")
+            os.link(src, dst)
+
+            copy_file(str(other), str(dst), 5)
+
+            self.assertEqual(dst.read_text(encoding="utf-8"), "other")
+            self.assertEqual(src.read_text(encoding="utf-8"), "source")
+
+    def test_copy_files_link_mode(self):
+        with tempfile.TemporaryDirectory() as td:
+            files = []
+            for i in range(5):
+                src = Path(td) / f"{i}.txt"
+                src.write_text(str(i), encoding="utf-8")
+                files.append((str(src), str(Path(td) / f"{i}.link"), 1))
+
+            copy_files(files, jobs=3, link=True)
+
+            for src, dst, _ in files:
+                self.assertTrue(os.path.samefile(src, dst))
+
+    def test_copy_empty_file(self):
+        with tempfile.TemporaryDirectory() as td:
+            src = Path(td) / "empty"
+            dst = Path(td) / "copy"
+            src.write_bytes(b"")
+
+            copy_file(str(src), str(dst), 0)
+
+            self.assertEqual(dst.read_bytes(), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
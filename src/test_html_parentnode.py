@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import LeafNode, ParentNode
@@ -67,6 +68,26 @@ class TestHTMLLeafNode(unittest.TestCase):
         parent_node = ParentNode("div", [child_node])
         self.assertEqual(parent_node.to_html(), "<div>child</div>")
 
+    def test_write_html_streams_same_markup(self):
+        grandchild_node = ParentNode("a", [LeafNode("b", "bold")], {"href": "/"})
+        parent_node = ParentNode(
+            "div", [LeafNode(None, "text "), ParentNode("span", [grandchild_node])]
+        )
+        fragments: list[str] = []
+
+        class Collector:
+            def write(self, s: str) -> None:
+                fragments.append(s)
+
+        parent_node.write_html(Collector())
+        self.assertGreater(len(fragments), 1)
+        self.assertEqual("".join(fragments), parent_node.to_html())
+
+    def test_write_html_nested_child_without_children(self):
+        parent_node = ParentNode("div", [ParentNode("span", [])])
+        with self.assertRaises(ValueError):
+            parent_node.write_html(io.StringIO())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,78 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from logger import configure_logging, logger, shutdown_logging
+
+
+class TestLogger(unittest.TestCase):
+    def tearDown(self):
+        shutdown_logging()
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+            handler.close()
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+
+    def test_background_writer_flushes_on_shutdown(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "build.log"
+            configure_logging(path)
+            logger.info("built %d pages", 3)
+            logger.debug("per page detail")
+            shutdown_logging()
+
+            lines = path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 1)
+            self.assertTrue(lines[0].endswith(" - built 3 pages"))
+
+    def test_shutdown_restores_previous_handlers(self):
+        previous = logging.NullHandler()
+        logger.addHandler(previous)
+        logger.setLevel(logging.WARNING)
+        with tempfile.TemporaryDirectory() as td:
+            configure_logging(Path(td) / "build.log", level="DEBUG")
+            self.assertNotIn(previous, logger.handlers)
+            # configuring again doesn't lose what was there first
+            configure_logging(Path(td) / "build.log")
+            shutdown_logging()
+
+        self.assertEqual(logger.handlers, [previous])
+        self.assertEqual(logger.level, logging.WARNING)
+        self.assertTrue(logger.propagate)
+
+    def test_json_lines(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "build.jsonl"
+            configure_logging(path, level="DEBUG", json_lines=True)
+            logger.debug("generating page from '%s'", "a.md")
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("failed")
+            shutdown_logging()
+
+            entries = [
+                json.loads(line)
+                for line in path.read_text(encoding="utf-8").splitlines()
+            ]
+            self.assertEqual(entries[0]["level"], "DEBUG")
+            self.assertEqual(entries[0]["message"], "generating page from 'a.md'")
+            self.assertEqual(entries[1]["level"], "ERROR")
+            self.assertIn("ValueError: boom", entries[1]["message"])
+
+    def test_debug_records_are_not_built_at_info(self):
+        class Exploding:
+            def __str__(self):
+                raise AssertionError("formatted a filtered record")
+
+        with tempfile.TemporaryDirectory() as td:
+            configure_logging(Path(td) / "build.log")
+            logger.debug("copied: %s", Exploding())
+            shutdown_logging()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,7 @@
+import tempfile
+import textwrap
 import unittest
+from pathlib import Path
 
 from textnode import TextType, TextNode
 from markdown_handler import (
@@ -10,9 +13,13 @@ from markdown_handler import (
     split_nodes_image,
     split_nodes_link,
     text_to_textnodes,
+    iter_markdown_blocks,
+    iter_markdown_file_blocks,
+    stream_markdown_file,
     markdown_to_blocks,
     markdown_to_html_node,
     extract_title,
+    parse_document,
 )
 
 
@@ -284,6 +291,35 @@ class TestMarkdownHanlder(unittest.TestCase):
         new_nodes = text_to_textnodes(text)
         self.assertRaises(ValueError)
 
+    def test_text_to_textnodes_links_between_markup(self):
+        text = "a [**not bold**](/x) b **bold** [c](/y)`code`"
+        new_nodes = text_to_textnodes(text)
+        self.assertListEqual(
+            [
+                TextNode("a ", TextType.TEXT),
+                TextNode("**not bold**", TextType.LINK, "/x"),
+                TextNode(" b ", TextType.TEXT),
+                TextNode("bold", TextType.BOLD),
+                TextNode(" ", TextType.TEXT),
+                TextNode("c", TextType.LINK, "/y"),
+                TextNode("code", TextType.CODE),
+            ],
+            new_nodes,
+        )
+
+    def test_text_to_textnodes_empty_delimited_span(self):
+        new_nodes = text_to_textnodes("a``b")
+        self.assertListEqual(
+            [TextNode("a", TextType.TEXT), TextNode("b", TextType.TEXT)], new_nodes
+        )
+
+    def test_text_to_textnodes_unmatched_delimiter(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("some `code and **bold**")
+
+    def test_text_to_textnodes_empty_text(self):
+        self.assertListEqual([TextNode("", TextType.TEXT)], text_to_textnodes(""))
+
     def test_markdown_to_blocks(self):
         md = """
 This is **bolded** paragraph
@@ -381,6 +417,17 @@ This is the same paragraph on a new line
         block_type = block_to_block_type(md)
         self.assertNotEqual(BlockType.HEADING, block_type)
 
+    def test_block_to_blocktype_ordered_list_numbering(self):
+        for md in ["1. a\n2. b", "1. a\n 2. b\n+3. c", "1. a\n0_2. b", "1. a\n٢. b"]:
+            self.assertEqual(BlockType.ORDERED_LIST, block_to_block_type(md), md)
+        for md in ["1. a\n3. b", "2. a", "1.a", " 1. a", "1. a\n-2. b", "1. a\n2 b"]:
+            self.assertEqual(BlockType.PARAGRAPH, block_to_block_type(md), md)
+
+    def test_block_to_blocktype_mixed_line_prefixes(self):
+        self.assertEqual(BlockType.PARAGRAPH, block_to_block_type("> quote\nplain"))
+        self.assertEqual(BlockType.PARAGRAPH, block_to_block_type("- item\n-no space"))
+        self.assertEqual(BlockType.QUOTE, block_to_block_type(">a\n>\n> b"))
+
     def test_block_to_blocktype_code(self):
         md = "```\nThis is a codeblock```"
         block_type = block_to_block_type(md)
@@ -589,3 +636,61 @@ Here is some paragraph
 """
         title = extract_title(md)
         self.assertEqual(title, "Lists")
+
+    def test_iter_markdown_blocks_matches_markdown_to_blocks(self):
+        md = "# Title\n\n\n\npara  \n  line\n \n\n- a\n- b\n\n\n"
+        blocks = list(iter_markdown_blocks(md.split("\n")))
+        self.assertEqual(blocks, markdown_to_blocks(md))
+
+    def test_iter_markdown_file_blocks_dedents_like_textwrap(self):
+        md = "\n    # Title\n\n      code\n    - a\n  \n    > q\n"
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "doc.md"
+            path.write_text(md, encoding="utf-8")
+            blocks = list(iter_markdown_file_blocks(path))
+        expected = markdown_to_blocks(textwrap.dedent(md).strip("\n"))
+        self.assertEqual(blocks, expected)
+
+    def test_stream_markdown_file_matches_markdown_to_html_node(self):
+        md = "# Big\n\nsome **bold** text\n\n```\ncode\n```\n\n1. one\n2. two"
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "doc.md"
+            path.write_text(md, encoding="utf-8")
+            title, body = stream_markdown_file(path)
+            html = body.to_html()
+        self.assertEqual(title, "Big")
+        self.assertEqual(html, markdown_to_html_node(md).to_html())
+
+    def test_stream_markdown_file_without_title(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "doc.md"
+            path.write_text("no title\n\n# late", encoding="utf-8")
+            with self.assertRaises(ValueError):
+                stream_markdown_file(path)
+
+    def test_parse_document(self):
+        md = """
+        # Guide
+
+        intro with `code`
+
+        ## Install
+
+        ### Linux **only**
+
+        #### not a heading
+        """
+        doc = parse_document(md)
+        self.assertEqual(doc.title, "Guide")
+        self.assertEqual(
+            doc.headings,
+            [(1, "Guide"), (2, "Install"), (3, "Linux **only**"), (4, "not a heading")],
+        )
+        self.assertEqual(len(doc.blocks), 5)
+        self.assertEqual(doc.root.to_html(), markdown_to_html_node(md).to_html())
+
+    def test_parse_document_without_title(self):
+        with self.assertRaises(ValueError):
+            parse_document("## Subtitle\n\ntext")
+        with self.assertRaises(ValueError):
+            parse_document("")
@@ -0,0 +1,135 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from main import generate_pages_recursive
+from minify import MinifyingWriter, minify_html
+from template import compile_template
+
+
+class TestMinify(unittest.TestCase):
+    def test_collapses_whitespace_between_inline_elements(self):
+        self.assertEqual(
+            minify_html("<p>a  <b>bold</b>\n   <i>x</i>\tand\n text</p>"),
+            "<p>a <b>bold</b> <i>x</i> and text</p>",
+        )
+
+    def test_drops_whitespace_around_block_elements(self):
+        self.assertEqual(
+            minify_html("<!doctype html>\n<html>\n  <body>\n    <p>Hi</p>\n  </body>\n</html>\n"),
+            "<!doctype html><html><body><p>Hi</p></body></html>",
+        )
+
+    def test_keeps_pre_and_code_content(self):
+        html = "<div>\n  <pre><code>  x  =  1\n\n    y </code></pre>\n<p>run <code>a  b</code> now</p></div>"
+        self.assertEqual(
+            minify_html(html),
+            "<div><pre><code>  x  =  1\n\n    y </code></pre><p>run <code>a  b</code> now</p></div>",
+        )
+
+    def test_keeps_non_breaking_spaces(self):
+        self.assertEqual(minify_html("<p>a\xa0\xa0 b</p>"), "<p>a\xa0\xa0 b</p>")
+
+    def test_tags_and_attributes_untouched(self):
+        html = '<a href="/x y"  title="a > b">link</a>'
+        self.assertEqual(minify_html(html), html)
+
+    def test_split_writes_match_whole_input(self):
+        html = (
+            "<html>\n<body>\n  <h1>Title  here</h1>\n"
+            "<p>some <b>bold</b>  text <!-- note -->\n and more</p>\n"
+            "<pre>\n  keep   this\n</pre>\n<ul>\n <li>one</li>\n <li>two</li>\n</ul>\n"
+            "</body>\n</html>\n"
+        )
+        whole = minify_html(html)
+        for size in (1, 2, 3, 5, 7, 13):
+            buf = io.StringIO()
+            writer = MinifyingWriter(buf)
+            for i in range(0, len(html), size):
+                writer.write(html[i : i + size])
+            writer.close()
+            self.assertEqual(buf.getvalue(), whole, size)
+
+    def test_stray_lt_in_text_is_not_a_tag(self):
+        for html, expected in [
+            ("<p>a  <  b</p>", "<p>a < b</p>"),
+            ("<p>1<2 and  x</p>", "<p>1<2 and x</p>"),
+            # an unclosed "<b" mustn't swallow the <pre> after it
+            (
+                "<p>x <b and  y</p><pre>  keep   this</pre>",
+                "<p>x <b and y</p><pre>  keep   this</pre>",
+            ),
+        ]:
+            self.assertEqual(minify_html(html), expected)
+            for size in (1, 2, 3):
+                buf = io.StringIO()
+                writer = MinifyingWriter(buf)
+                for i in range(0, len(html), size):
+                    writer.write(html[i : i + size])
+                writer.close()
+                self.assertEqual(buf.getvalue(), expected, (html, size))
+
+    def test_long_tag_written_in_small_pieces(self):
+        # each write scans only what it adds, so this stays linear
+        tag = '<a title="' + "x " * 30_000 + '">'
+        buf = io.StringIO()
+        writer = MinifyingWriter(buf)
+        html = f"<p>a  {tag}link</a>  b</p>"
+        for i in range(0, len(html), 4):
+            writer.write(html[i : i + 4])
+        writer.close()
+        # not assertEqual, whose diff of strings this long takes ages
+        self.assertTrue(buf.getvalue() == f"<p>a {tag}link</a> b</p>")
+
+    def test_template_transform_keeps_space_next_to_placeholder(self):
+        template = compile_template("<p>\n  Hello  {{ Title }}, bye\n</p>\n{{ Content }}\n")
+        minified = template.transform(minify_html)
+        self.assertEqual(minified.segments, ["<p>Hello ", ", bye</p>", ""])
+        self.assertEqual(minified.slots, template.slots)
+
+
+class TestMinifiedBuild(unittest.TestCase):
+    def test_minified_builds_match_across_modes(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content = root / "content"
+            content.mkdir()
+            for i in range(6):
+                (content / f"page{i}.md").write_text(
+                    f"# Page {i}\n\nSome  **bold**   text {i}\n\n"
+                    "```\n  indented   code\n```\n\n- one\n- two",
+                    encoding="utf-8",
+                )
+            template = root / "template.html"
+            template.write_text(
+                "<html>\n  <head>\n    <title>{{ Title }}</title>\n  </head>\n"
+                "  <body>\n    <article>\n{{ Content }}\n    </article>\n  </body>\n</html>\n",
+                encoding="utf-8",
+            )
+
+            generate_pages_recursive(content, template, root / "serial", minify=True)
+            generate_pages_recursive(
+                content, template, root / "parallel", jobs=2, minify=True
+            )
+            generate_pages_recursive(
+                content, template, root / "async", io_jobs=2, minify=True
+            )
+            generate_pages_recursive(
+                content, template, root / "streamed", stream_threshold=0, minify=True
+            )
+
+            page = (root / "serial" / "page0.html").read_text(encoding="utf-8")
+            self.assertTrue(page.startswith("<html><head><title>Page 0</title>"))
+            self.assertIn("<pre><code>  indented   code\n</code></pre>", page)
+            self.assertNotIn("\n  ", page.replace("  indented", ""))
+            for path in (root / "serial").rglob("*.html"):
+                rel = path.relative_to(root / "serial")
+                for mode in ("parallel", "async", "streamed"):
+                    self.assertEqual(
+                        path.read_bytes(), (root / mode / rel).read_bytes(), mode
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
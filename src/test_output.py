@@ -0,0 +1,62 @@
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+from output import OutputFile, write_output
+
+
+class TestOutputFile(unittest.TestCase):
+    def test_write_creates_file_without_leftovers(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "page.html"
+            self.assertTrue(write_output(path, "<p>hi</p>"))
+            self.assertEqual(path.read_text(encoding="utf-8"), "<p>hi</p>")
+            self.assertEqual(os.listdir(td), ["page.html"])
+
+    def test_unchanged_content_keeps_file(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "page.html"
+            path.write_text("<p>hi</p>", encoding="utf-8")
+            os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+            self.assertFalse(write_output(path, "<p>hi</p>", compare=True))
+            self.assertEqual(path.stat().st_mtime_ns, 1_000_000_000)
+
+            self.assertTrue(write_output(path, "<p>ho</p>", compare=True))
+            self.assertEqual(path.read_text(encoding="utf-8"), "<p>ho</p>")
+            self.assertEqual(os.listdir(td), ["page.html"])
+
+    def test_without_compare_always_rewrites(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "page.html"
+            path.write_text("<p>hi</p>", encoding="utf-8")
+            self.assertTrue(write_output(path, "<p>hi</p>"))
+
+    def test_failed_write_keeps_old_file(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "page.html"
+            path.write_text("old", encoding="utf-8")
+
+            with self.assertRaises(RuntimeError):
+                with OutputFile(path) as fp:
+                    fp.write("half a pa")
+                    raise RuntimeError("render failed")
+
+            self.assertEqual(path.read_text(encoding="utf-8"), "old")
+            self.assertEqual(os.listdir(td), ["page.html"])
+
+    def test_permissions_follow_umask(self):
+        old = os.umask(0o022)
+        try:
+            with tempfile.TemporaryDirectory() as td:
+                path = Path(td) / "page.html"
+                write_output(path, "x")
+                self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o644)
+        finally:
+            os.umask(old)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from main import generate_pages_recursive
+from render_cache import RenderCache
+
+
+def _put_many(root: str, worker: int) -> None:
+    cache = RenderCache(root)
+    for i in range(50):
+        cache.put(f"# Page {i}", f"Page {i}", f"<p>{i} from {worker}</p>")
+
+
+class TestRenderCache(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as td:
+            cache = RenderCache(td)
+            self.assertIsNone(cache.get("# A"))
+            cache.put("# A", "A", "<h1>A</h1>")
+
+            self.assertEqual(cache.get("# A"), ("A", "<h1>A</h1>", None))
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_entries_without_terms_miss_when_terms_are_wanted(self):
+        with tempfile.TemporaryDirectory() as td:
+            cache = RenderCache(td)
+            cache.put("# A", "A", "<h1>A</h1>")
+            self.assertIsNone(cache.get("# A", terms=True))
+
+            cache.put("# A", "A", "<h1>A</h1>", ["a"])
+            self.assertEqual(cache.get("# A", terms=True), ("A", "<h1>A</h1>", ["a"]))
+
+    def test_key_depends_on_salt(self):
+        with tempfile.TemporaryDirectory() as td:
+            self.assertNotEqual(
+                RenderCache(td).key("# A"), RenderCache(td, salt="assets").key("# A")
+            )
+
+    def test_prune_drops_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as td:
+            cache = RenderCache(td)
+            for i in range(4):
+                cache.put(f"# {i}", str(i), "x" * 100)
+                path = cache._path(cache.key(f"# {i}"))
+                os.utime(path, ns=(i * 10**9, i * 10**9))
+
+            entry_size = cache.size() // 4
+            removed, freed = cache.prune(max_bytes=entry_size * 2)
+
+            self.assertEqual((removed, freed), (2, entry_size * 2))
+            self.assertIsNone(cache.get("# 0"))
+            self.assertIsNone(cache.get("# 1"))
+            self.assertIsNotNone(cache.get("# 3"))
+
+    def test_concurrent_writers(self):
+        with tempfile.TemporaryDirectory() as td:
+            with ProcessPoolExecutor(max_workers=4) as pool:
+                list(pool.map(_put_many, [td] * 4, range(4)))
+
+            cache = RenderCache(td)
+            for i in range(50):
+                entry = cache.get(f"# Page {i}")
+                assert entry is not None
+                title, html, _ = entry
+                self.assertEqual(title, f"Page {i}")
+                self.assertTrue(html.startswith(f"<p>{i} from "))
+            self.assertEqual(list(Path(td).rglob(".tmp-*")), [])
+
+    def test_build_reuses_cached_pages(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content = root / "content"
+            content.mkdir()
+            (content / "a.md").write_text("# A\n\nSome **text**", encoding="utf-8")
+            template = root / "template.html"
+            template.write_text(
+                "<title>{{ Title }}</title>{{ Content }}", encoding="utf-8"
+            )
+
+            first = RenderCache(root / "cache")
+            generate_pages_recursive(
+                content, template, root / "one", render_cache=first
+            )
+            second = RenderCache(root / "cache")
+            generate_pages_recursive(
+                content, template, root / "two", render_cache=second
+            )
+
+            self.assertEqual((first.hits, first.misses), (0, 1))
+            self.assertEqual((second.hits, second.misses), (1, 0))
+            self.assertEqual(
+                (root / "one" / "a.html").read_bytes(),
+                (root / "two" / "a.html").read_bytes(),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
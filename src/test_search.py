@@ -0,0 +1,274 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import page
+from block_cache import BlockCache
+from main import generate_pages_recursive
+from markdown_handler import parse_document
+from render_cache import RenderCache
+from search import (
+    DOCS_PER_FILE,
+    SHARDS,
+    SearchIndex,
+    delta_decode,
+    delta_encode,
+    page_terms,
+    term_shard,
+)
+from utils import copy_static
+
+
+def lookup(public: Path, term: str) -> list[str]:
+    # what the search page does: one terms shard, then the docs it points at
+    meta = json.loads((public / "search" / "meta.json").read_text(encoding="utf-8"))
+    shard = term_shard(term, meta["shards"])
+    terms = json.loads(
+        (public / "search" / f"terms-{shard:02x}.json").read_text(encoding="utf-8")
+    )
+    urls = []
+    for doc_id in delta_decode(terms.get(term, [])):
+        docs_file = public / "search" / f"docs-{doc_id // DOCS_PER_FILE}.json"
+        docs = json.loads(docs_file.read_text(encoding="utf-8"))
+        urls.append(docs[doc_id % DOCS_PER_FILE][0])
+    return sorted(urls)
+
+
+class TestPageTerms(unittest.TestCase):
+    def test_terms_come_from_visible_text(self):
+        md = "\n\n".join(
+            [
+                "# Hello **World**",
+                "See [the docs](https://example.com/hidden) and ![Alt Text](img.png)",
+                "```\nprint_value(x)\n```",
+                "- café\n- a",
+            ]
+        )
+        texts: list[str] = []
+        parse_document(md, texts=texts)
+        self.assertEqual(
+            page_terms(texts),
+            [
+                "alt",
+                "and",
+                "café",
+                "docs",
+                "hello",
+                "print_value",
+                "see",
+                "text",
+                "the",
+                "world",
+            ],
+        )
+
+    def test_block_cache_hits_keep_their_text(self):
+        md = "# Title\n\nShared **paragraph**\n\n- listed item"
+        cache = BlockCache()
+        parse_document(md, cache)
+        collected = []
+        for _ in range(2):
+            texts: list[str] = []
+            parse_document(md, cache, texts)
+            collected.append(page_terms(texts))
+
+        self.assertGreater(cache.hits, 0)
+        self.assertEqual(collected[0], collected[1])
+        self.assertEqual(
+            collected[0], ["item", "listed", "paragraph", "shared", "title"]
+        )
+
+    def test_overlong_words_are_skipped(self):
+        self.assertEqual(page_terms(["short " + "x" * 40]), ["short"])
+
+    def test_delta_round_trip(self):
+        ids = [0, 3, 4, 100, 1000]
+        self.assertEqual(delta_encode(ids), [0, 3, 1, 96, 900])
+        self.assertEqual(delta_decode(delta_encode(ids)), ids)
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_unchanged_pages_rewrite_nothing(self):
+        with tempfile.TemporaryDirectory() as td:
+            public = Path(td) / "public"
+            index = SearchIndex(public, shards=8)
+            index.add("a.md", "/a.html", "A", ["apple", "banana"])
+            index.add("b.md", "/b.html", "B", ["banana", "cherry"])
+            self.assertEqual(index.write(), 8)
+
+            index = SearchIndex(public, shards=8)
+            self.assertTrue(index.keep("a.md"))
+            index.add("b.md", "/b.html", "B", ["banana", "cherry"])
+            self.assertEqual(index.write(), 0)
+
+    def test_changes_touch_only_their_shards(self):
+        with tempfile.TemporaryDirectory() as td:
+            public = Path(td) / "public"
+            index = SearchIndex(public, shards=8)
+            index.add("a.md", "/a.html", "A", ["apple", "banana"])
+            index.add("b.md", "/b.html", "B", ["banana", "cherry"])
+            index.add("c.md", "/c.html", "C", ["cherry"])
+            index.write()
+
+            index = SearchIndex(public, shards=8)
+            index.keep("a.md")
+            index.add("b.md", "/b.html", "B", ["date"])
+            rewritten = index.write()
+
+            touched = {term_shard(t, 8) for t in ["banana", "cherry", "date"]}
+            self.assertEqual(rewritten, len(touched))
+            self.assertEqual(lookup(public, "banana"), ["/a.html"])
+            self.assertEqual(lookup(public, "date"), ["/b.html"])
+            # c.md wasn't kept, so it's gone
+            self.assertEqual(lookup(public, "cherry"), [])
+            self.assertEqual(sorted(index.pages), ["a.md", "b.md"])
+
+    def test_ids_are_stable_and_reused(self):
+        with tempfile.TemporaryDirectory() as td:
+            public = Path(td) / "public"
+            index = SearchIndex(public, shards=4)
+            for name in "abc":
+                index.add(f"{name}.md", f"/{name}.html", name, [f"{name}{name}"])
+            index.write()
+
+            index = SearchIndex(public, shards=4)
+            index.keep("a.md")
+            index.keep("c.md")
+            index.write()
+            index = SearchIndex(public, shards=4)
+            index.keep("a.md")
+            index.keep("c.md")
+            index.add("d.md", "/d.html", "d", ["dd"])
+            index.write()
+
+            self.assertEqual(index.pages["a.md"][0], 0)
+            self.assertEqual(index.pages["c.md"][0], 2)
+            self.assertEqual(index.pages["d.md"][0], 1)
+            self.assertEqual(lookup(public, "dd"), ["/d.html"])
+            self.assertEqual(lookup(public, "cc"), ["/c.html"])
+
+
+class TestSearchBuild(unittest.TestCase):
+    def _write_site(self, root: Path) -> tuple[Path, Path]:
+        content = root / "content"
+        (content / "blog").mkdir(parents=True)
+        (content / "index.md").write_text(
+            "# Home\n\nWelcome to the **garden**", encoding="utf-8"
+        )
+        (content / "blog" / "roses.md").write_text(
+            "# Roses\n\n- pruning roses\n- garden tips", encoding="utf-8"
+        )
+        (content / "blog" / "tools.md").write_text(
+            "# Tools\n\n> a good spade", encoding="utf-8"
+        )
+        template = root / "template.html"
+        template.write_text("<title>{{ Title }}</title>{{ Content }}", encoding="utf-8")
+        return content, template
+
+    def test_build_modes_write_the_same_index(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content, template = self._write_site(root)
+            generate_pages_recursive(content, template, root / "serial", search=True)
+            generate_pages_recursive(
+                content, template, root / "parallel", jobs=2, search=True
+            )
+            generate_pages_recursive(
+                content, template, root / "async", io_jobs=2, search=True
+            )
+            generate_pages_recursive(
+                content, template, root / "streamed", stream_threshold=0, search=True
+            )
+
+            self.assertEqual(
+                lookup(root / "serial", "garden"), ["/", "/blog/roses.html"]
+            )
+            self.assertEqual(lookup(root / "serial", "spade"), ["/blog/tools.html"])
+            for mode in ("parallel", "async", "streamed"):
+                for term in ("garden", "spade", "roses", "home"):
+                    self.assertEqual(
+                        lookup(root / mode, term), lookup(root / "serial", term)
+                    )
+
+    def test_render_cache_hits_keep_their_terms(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content, template = self._write_site(root)
+            cache = RenderCache(root / "cache")
+            generate_pages_recursive(
+                content, template, root / "first", render_cache=cache, search=True
+            )
+
+            with mock.patch.object(page, "parse_document") as parse:
+                generate_pages_recursive(
+                    content, template, root / "second", render_cache=cache, search=True
+                )
+
+            parse.assert_not_called()
+            self.assertEqual(
+                lookup(root / "second", "garden"), ["/", "/blog/roses.html"]
+            )
+            self.assertEqual(lookup(root / "second", "spade"), ["/blog/tools.html"])
+
+    def test_full_rebuild_after_public_is_wiped(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content, template = self._write_site(root)
+            static = root / "static"
+            static.mkdir()
+            public = root / "public"
+            for _ in range(2):
+                # as a full build from the command line does
+                copy_static(str(static), str(public))
+                generate_pages_recursive(content, template, public, search=True)
+
+            terms = list((public / "search").glob("terms-*.json"))
+            self.assertEqual(len(terms), SHARDS)
+            self.assertTrue((public / "search" / "docs-0.json").exists())
+            self.assertEqual(lookup(public, "garden"), ["/", "/blog/roses.html"])
+
+    def test_incremental_build_updates_index(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content, template = self._write_site(root)
+            public = root / "public"
+            generate_pages_recursive(
+                content, template, public, incremental=True, search=True
+            )
+            (content / "blog" / "tools.md").write_text(
+                "# Tools\n\n> a sharp shovel", encoding="utf-8"
+            )
+            (content / "index.md").unlink()
+
+            summary = generate_pages_recursive(
+                content, template, public, incremental=True, search=True
+            )
+
+            self.assertEqual(summary.skipped, 1)
+            self.assertEqual(lookup(public, "spade"), [])
+            self.assertEqual(lookup(public, "shovel"), ["/blog/tools.html"])
+            self.assertEqual(lookup(public, "garden"), ["/blog/roses.html"])
+
+    def test_incremental_build_indexes_pages_missing_from_the_index(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content, template = self._write_site(root)
+            public = root / "public"
+            generate_pages_recursive(
+                content, template, public, incremental=True, search=True
+            )
+            # the index state is lost, the pages are all up to date
+            (root / "public.search.json").unlink()
+
+            summary = generate_pages_recursive(
+                content, template, public, incremental=True, search=True
+            )
+
+            self.assertEqual(summary.skipped, 3)
+            self.assertEqual(lookup(public, "garden"), ["/", "/blog/roses.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
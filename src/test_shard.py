@@ -0,0 +1,213 @@
+import random
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+import main
+from main import generate_pages_recursive
+from manifest import manifest_path
+from shard import MergeError, merge_shards, parse_shard, partition, shard_dir
+from utils import copy_static
+
+
+class TestPartition(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for bad in ("0/4", "5/4", "2", "a/b", "1/0"):
+            with self.assertRaises(ValueError):
+                parse_shard(bad)
+
+    def test_partition_is_deterministic_and_balanced(self):
+        rels = [f"blog/{i:04d}/post.md" for i in range(2000)]
+        shuffled = random.Random(7).sample(rels, len(rels))
+
+        assigned = partition(rels, 4)
+        self.assertEqual(assigned, partition(shuffled, 4))
+        self.assertEqual(set(assigned), set(rels))
+        counts = Counter(assigned.values())
+        self.assertEqual(sorted(counts), [1, 2, 3, 4])
+        for count in counts.values():
+            self.assertLess(abs(count - 500), 75)
+
+    def test_partition_is_stable(self):
+        rels = [f"page{i}.md" for i in range(500)]
+        assigned = partition(rels, 4)
+
+        # a new page moves nobody else
+        grown = partition(rels + ["new.md"], 4)
+        self.assertEqual({rel: grown[rel] for rel in rels}, assigned)
+        # a new shard only takes pages over
+        more = partition(rels, 5)
+        moved = [rel for rel in rels if more[rel] != assigned[rel]]
+        self.assertTrue(moved)
+        self.assertTrue(all(more[rel] == 5 for rel in moved))
+
+
+class TestShardedBuild(unittest.TestCase):
+    def _write_site(self, root: Path) -> tuple[Path, Path, Path]:
+        content = root / "content"
+        (content / "blog").mkdir(parents=True)
+        for i in range(12):
+            (content / "blog" / f"post{i}.md").write_text(
+                f"# Post {i}\n\n" + "words " * (i * 50), encoding="utf-8"
+            )
+        (content / "index.md").write_text("# Home\n\nHello", encoding="utf-8")
+        static = root / "static"
+        static.mkdir()
+        (static / "index.css").write_text("body {}", encoding="utf-8")
+        template = root / "template.html"
+        template.write_text("<title>{{ Title }}</title>{{ Content }}", encoding="utf-8")
+        return content, template, static
+
+    def _build_shards(self, root: Path, count: int) -> list[Path]:
+        content, template, static = self._write_site(root)
+        public = root / "public"
+        dirs = []
+        for index in range(1, count + 1):
+            out = shard_dir(public, index)
+            if index == 1:
+                copy_static(str(static), str(out))
+            generate_pages_recursive(content, template, out, shard=(index, count))
+            dirs.append(out)
+        return dirs
+
+    def test_merged_shards_match_single_build(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            dirs = self._build_shards(root, 3)
+            content, template = root / "content", root / "template.html"
+            copy_static(str(root / "static"), str(root / "single"))
+            generate_pages_recursive(content, template, root / "single")
+
+            built = [len(list(d.rglob("*.html"))) for d in dirs]
+            self.assertEqual(sum(built), 13)
+            self.assertTrue(all(built))
+
+            manifest = merge_shards(dirs, root / "public")
+
+            self.assertEqual(len(manifest.pages), 13)
+            single = sorted(
+                p.relative_to(root / "single")
+                for p in (root / "single").rglob("*")
+                if p.is_file()
+            )
+            merged = sorted(
+                p.relative_to(root / "public")
+                for p in (root / "public").rglob("*")
+                if p.is_file()
+            )
+            self.assertEqual(merged, single)
+            for rel in single:
+                self.assertEqual(
+                    (root / "public" / rel).read_bytes(),
+                    (root / "single" / rel).read_bytes(),
+                )
+            # the merged manifest lets a later incremental build skip everything
+            summary = generate_pages_recursive(
+                content, template, root / "public", incremental=True
+            )
+            self.assertEqual(summary.skipped, 13)
+
+    def test_merge_shards_moved_after_building(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            dirs = self._build_shards(root, 2)
+            # as when each shard is built on its own machine and copied over
+            (root / "artifacts").mkdir()
+            moved = []
+            for shard in dirs:
+                target = root / "artifacts" / shard.name
+                shard.rename(target)
+                manifest_path(shard).rename(manifest_path(target))
+                moved.append(target)
+
+            manifest = merge_shards(moved, root / "public")
+
+            self.assertEqual(len(manifest.pages), 13)
+            self.assertEqual(
+                manifest.output_path("blog/post3.md"),
+                root / "public" / "blog" / "post3.html",
+            )
+            summary = generate_pages_recursive(
+                root / "content",
+                root / "template.html",
+                root / "public",
+                incremental=True,
+            )
+            self.assertEqual(summary.skipped, 13)
+
+    def test_merge_rejects_paths_claimed_twice(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            dirs = self._build_shards(root, 2)
+            (dirs[1] / "index.css").write_text("p {}", encoding="utf-8")
+            (root / "public").mkdir()
+            (root / "public" / "keep.txt").write_text("x", encoding="utf-8")
+
+            with self.assertRaises(MergeError) as ctx:
+                merge_shards(dirs, root / "public")
+
+            self.assertIn("index.css", str(ctx.exception))
+            # nothing was touched
+            self.assertTrue((root / "public" / "keep.txt").exists())
+            self.assertFalse(manifest_path(root / "public").exists())
+
+    def test_merge_with_empty_shards(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            # more shards than the 13 pages, so some get nothing to build
+            dirs = self._build_shards(root, 16)
+            empty = [d for d in dirs if d.is_dir() and not any(d.iterdir())]
+            self.assertTrue(empty)
+            # as when an empty directory doesn't survive being copied over
+            empty[0].rmdir()
+
+            manifest = merge_shards(dirs, root / "public", link=True)
+
+            self.assertEqual(len(manifest.pages), 13)
+            self.assertTrue((root / "public" / "blog" / "post3.html").exists())
+
+    def test_merge_needs_shard_manifests(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            dirs = self._build_shards(root, 2)
+            manifest_path(dirs[1]).unlink()
+
+            with self.assertRaises(MergeError):
+                merge_shards(dirs, root / "public")
+
+
+class TestMergeCommand(unittest.TestCase):
+    ARGV = ["--log-file", "-", "--log-level", "ERROR"]
+
+    def test_merge_takes_output_options_after_the_command(self):
+        with mock.patch.object(main, "_merge") as merge:
+            main.main(
+                self.ARGV
+                + ["merge", "a", "b", "--base-url", "https://example.com"]
+                + ["--precompress", "--link-static"]
+            )
+        args = merge.call_args.args[0]
+        self.assertEqual(args.shards, [Path("a"), Path("b")])
+        self.assertEqual(args.base_url, "https://example.com")
+        self.assertTrue(args.precompress and args.link_static)
+
+        # and before it, as for any other command
+        with mock.patch.object(main, "_merge") as merge:
+            main.main(self.ARGV + ["--base-url", "https://example.com", "merge", "a"])
+        self.assertEqual(merge.call_args.args[0].base_url, "https://example.com")
+
+    def test_merge_errors_exit_non_zero(self):
+        failing = mock.patch.object(
+            main, "merge_shards", side_effect=MergeError("index.css: a and b")
+        )
+        with failing, mock.patch("sys.stderr"):
+            with self.assertRaises(SystemExit) as ctx:
+                main.main(self.ARGV + ["merge", "a", "b"])
+        self.assertNotEqual(ctx.exception.code, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
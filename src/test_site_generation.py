@@ -1,8 +1,12 @@
+import os
 import unittest
 import tempfile
 from pathlib import Path
 
+from block_cache import BlockCache
 from main import generate_pages_recursive
+from parallel import BuildError
+from template import TemplateError
 from utils import copy_static
 
 
@@ -100,6 +104,329 @@ class TestSiteGeneration(unittest.TestCase):
             self.assertTrue((public / "index.css").exists())
             self.assertTrue((public / "images" / "tolkien.png").exists())
 
+    def _write_site(self, root: Path) -> tuple[Path, Path, Path]:
+        content = root / "content"
+        public = root / "public"
+        (content / "blog").mkdir(parents=True)
+        (content / "index.md").write_text("# Home\n\nHello", encoding="utf-8")
+        (content / "blog" / "post.md").write_text("# Post\n\nBody", encoding="utf-8")
+        template = root / "template.html"
+        template.write_text("<title>{{ Title }}</title>{{ Content }}", encoding="utf-8")
+        return content, template, public
+
+    def test_incremental_build_skips_unchanged_pages(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            generate_pages_recursive(content, template, public, incremental=True)
+
+            # mark outputs so a regeneration would be visible
+            (public / "index.html").write_text("untouched", encoding="utf-8")
+            (public / "blog" / "post.html").write_text("untouched", encoding="utf-8")
+            (content / "blog" / "post.md").write_text(
+                "# Post\n\nChanged", encoding="utf-8"
+            )
+
+            generate_pages_recursive(content, template, public, incremental=True)
+
+            self.assertEqual(
+                (public / "index.html").read_text(encoding="utf-8"), "untouched"
+            )
+            self.assertIn(
+                "Changed", (public / "blog" / "post.html").read_text(encoding="utf-8")
+            )
+
+    def test_incremental_build_template_change_invalidates_all(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            generate_pages_recursive(content, template, public, incremental=True)
+
+            template.write_text("<h1>{{ Title }}</h1>{{ Content }}", encoding="utf-8")
+            generate_pages_recursive(content, template, public, incremental=True)
+
+            self.assertIn(
+                "<h1>Home</h1>", (public / "index.html").read_text(encoding="utf-8")
+            )
+            self.assertIn(
+                "<h1>Post</h1>",
+                (public / "blog" / "post.html").read_text(encoding="utf-8"),
+            )
+
+    def test_incremental_build_removes_deleted_pages(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            generate_pages_recursive(content, template, public, incremental=True)
+
+            (content / "blog" / "post.md").unlink()
+            generate_pages_recursive(content, template, public, incremental=True)
+
+            self.assertTrue((public / "index.html").exists())
+            self.assertFalse((public / "blog" / "post.html").exists())
+
+    def test_template_change_still_removes_deleted_pages(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            generate_pages_recursive(content, template, public, incremental=True)
+
+            template.write_text("<h1>{{ Title }}</h1>{{ Content }}", encoding="utf-8")
+            (content / "blog" / "post.md").unlink()
+            summary = generate_pages_recursive(
+                content, template, public, incremental=True
+            )
+
+            self.assertEqual((summary.skipped, summary.removed), (0, 1))
+            self.assertFalse((public / "blog" / "post.html").exists())
+
+    def test_incremental_build_regenerates_missing_output(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            generate_pages_recursive(content, template, public, incremental=True)
+
+            (public / "index.html").unlink()
+            generate_pages_recursive(content, template, public, incremental=True)
+
+            self.assertTrue((public / "index.html").exists())
+
+    def test_write_if_changed_leaves_identical_pages_alone(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            first = generate_pages_recursive(content, template, public)
+            self.assertEqual((first.rewritten, first.unchanged), (2, 0))
+
+            post = public / "blog" / "post.html"
+            os.utime(post, ns=(1_000_000_000, 1_000_000_000))
+            (content / "index.md").write_text("# Home\n\nnew text", encoding="utf-8")
+
+            # only the edited page is rewritten, then nothing in either mode
+            expected = [(1, 1), (0, 2), (0, 2)]
+            for (jobs, io_jobs), counts in zip([(1, 0), (2, 0), (1, 2)], expected):
+                summary = generate_pages_recursive(
+                    content,
+                    template,
+                    public,
+                    jobs=jobs,
+                    io_jobs=io_jobs,
+                    write_if_changed=True,
+                )
+                self.assertEqual((summary.rewritten, summary.unchanged), counts)
+                self.assertEqual(post.stat().st_mtime_ns, 1_000_000_000)
+            self.assertIn("new text", (public / "index.html").read_text())
+
+    def test_parallel_build_matches_serial_output(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content, template, _ = self._write_site(root)
+            for i in range(20):
+                (content / f"page{i}.md").write_text(
+                    f"# Page {i}\n\n- **item** {i}\n- [link](/p{i})", encoding="utf-8"
+                )
+
+            generate_pages_recursive(content, template, root / "serial")
+            generate_pages_recursive(content, template, root / "parallel", jobs=3)
+
+            serial = sorted((root / "serial").rglob("*.html"))
+            self.assertEqual(len(serial), 22)
+            for path in serial:
+                other = root / "parallel" / path.relative_to(root / "serial")
+                self.assertEqual(path.read_bytes(), other.read_bytes())
+
+    def test_async_build_matches_serial_output(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content, template, _ = self._write_site(root)
+            for i in range(20):
+                (content / f"page{i}.md").write_text(
+                    f"# Page {i}\n\n> _quote_ {i}\n\n1. one\n2. two", encoding="utf-8"
+                )
+            (content / "big.md").write_text("# Big\n\n- a\n- b", encoding="utf-8")
+
+            generate_pages_recursive(content, template, root / "serial")
+            generate_pages_recursive(
+                content,
+                template,
+                root / "async",
+                io_jobs=4,
+                block_cache=BlockCache(),
+                stream_threshold=20,
+            )
+
+            serial = sorted((root / "serial").rglob("*.html"))
+            self.assertEqual(len(serial), 23)
+            for path in serial:
+                other = root / "async" / path.relative_to(root / "serial")
+                self.assertEqual(path.read_bytes(), other.read_bytes())
+
+    def test_async_build_reports_failed_pages(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            (content / "broken.md").write_text("no title here", encoding="utf-8")
+
+            with self.assertRaises(BuildError) as ctx:
+                generate_pages_recursive(content, template, public, io_jobs=2)
+
+            self.assertEqual(
+                [path.name for path, _ in ctx.exception.failures], ["broken.md"]
+            )
+            self.assertTrue((public / "blog" / "post.html").exists())
+
+    def test_block_cache_output_matches_uncached(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content, template, _ = self._write_site(root)
+            for i in range(6):
+                (content / f"page{i}.md").write_text(
+                    f"# Page {i}\n\n> shared _notice_\n\n- same\n- list",
+                    encoding="utf-8",
+                )
+
+            generate_pages_recursive(content, template, root / "plain")
+            serial_cache = BlockCache()
+            generate_pages_recursive(
+                content, template, root / "serial", block_cache=serial_cache
+            )
+            parallel_cache = BlockCache()
+            generate_pages_recursive(
+                content, template, root / "parallel", jobs=2, block_cache=parallel_cache
+            )
+
+            self.assertGreaterEqual(serial_cache.hits, 10)
+            self.assertGreater(parallel_cache.hits, 0)
+            for path in (root / "plain").rglob("*.html"):
+                rel = path.relative_to(root / "plain")
+                self.assertEqual(path.read_bytes(), (root / "serial" / rel).read_bytes())
+                self.assertEqual(
+                    path.read_bytes(), (root / "parallel" / rel).read_bytes()
+                )
+
+    def test_streamed_pages_match_regular_output(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content, template, _ = self._write_site(root)
+            (content / "big.md").write_text(
+                "# Big\n\n" + "\n\n".join(f"- item **{i}**" for i in range(200)),
+                encoding="utf-8",
+            )
+
+            generate_pages_recursive(content, template, root / "plain")
+            generate_pages_recursive(
+                content, template, root / "streamed", stream_threshold=0
+            )
+            generate_pages_recursive(
+                content, template, root / "parallel", jobs=2, stream_threshold=0
+            )
+
+            for path in (root / "plain").rglob("*.html"):
+                rel = path.relative_to(root / "plain")
+                self.assertEqual(
+                    path.read_bytes(), (root / "streamed" / rel).read_bytes()
+                )
+                self.assertEqual(
+                    path.read_bytes(), (root / "parallel" / rel).read_bytes()
+                )
+
+    def test_unknown_placeholder_fails_before_any_page(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            template.write_text("<p>{{ Autor }}</p>{{ Content }}", encoding="utf-8")
+
+            for jobs in (1, 2):
+                with self.assertRaises(TemplateError) as ctx:
+                    generate_pages_recursive(content, template, public, jobs=jobs)
+                self.assertIn("line 1", str(ctx.exception))
+            self.assertFalse(public.exists())
+
+    def test_parallel_build_reports_failed_pages(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            (content / "broken.md").write_text("no title here", encoding="utf-8")
+
+            with self.assertRaises(BuildError) as ctx:
+                generate_pages_recursive(content, template, public, jobs=2)
+
+            self.assertEqual(
+                [path.name for path, _ in ctx.exception.failures], ["broken.md"]
+            )
+            self.assertTrue((public / "index.html").exists())
+            self.assertTrue((public / "blog" / "post.html").exists())
+
+    def _write_static(self, root: Path) -> tuple[Path, Path]:
+        static = root / "static"
+        public = root / "public"
+        (static / "images").mkdir(parents=True)
+        (static / "index.css").write_text("body {}", encoding="utf-8")
+        (static / "images" / "tolkien.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+        return static, public
+
+    def test_sync_static_copies_only_changed_files(self):
+        with tempfile.TemporaryDirectory() as td:
+            static, public = self._write_static(Path(td))
+            stats = copy_static(str(static), str(public), sync=True)
+            self.assertEqual((stats.copied, stats.skipped, stats.removed), (2, 0, 0))
+
+            (public / "index.html").write_text("generated", encoding="utf-8")
+            (static / "index.css").write_text("body { color: red }", encoding="utf-8")
+            stats = copy_static(str(static), str(public), sync=True)
+
+            self.assertEqual((stats.copied, stats.skipped, stats.removed), (1, 1, 0))
+            self.assertEqual(stats.copied_bytes, len("body { color: red }"))
+            self.assertEqual(
+                (public / "index.css").read_text(encoding="utf-8"),
+                "body { color: red }",
+            )
+            self.assertTrue((public / "index.html").exists())
+
+    def test_sync_static_removes_only_stale_static_files(self):
+        with tempfile.TemporaryDirectory() as td:
+            static, public = self._write_static(Path(td))
+            copy_static(str(static), str(public), sync=True)
+            (public / "index.html").write_text("generated", encoding="utf-8")
+
+            (static / "images" / "tolkien.png").unlink()
+            stats = copy_static(str(static), str(public), sync=True)
+
+            self.assertEqual((stats.copied, stats.skipped, stats.removed), (0, 1, 1))
+            self.assertFalse((public / "images").exists())
+            self.assertTrue((public / "index.html").exists())
+
+    def test_sync_static_hash_skips_touched_files(self):
+        with tempfile.TemporaryDirectory() as td:
+            static, public = self._write_static(Path(td))
+            copy_static(str(static), str(public), sync=True)
+
+            os.utime(static / "index.css", (0, 0))
+            stats = copy_static(str(static), str(public), sync=True, check_hash=True)
+
+            self.assertEqual((stats.copied, stats.skipped), (0, 2))
+
+    def test_parallel_copy_matches_sources(self):
+        with tempfile.TemporaryDirectory() as td:
+            static, public = self._write_static(Path(td))
+            (static / "empty").mkdir()
+            for i in range(30):
+                (static / "images" / f"{i}.bin").write_bytes(os.urandom(i * 997))
+
+            stats = copy_static(str(static), str(public), jobs=4)
+
+            self.assertEqual(stats.copied, 32)
+            self.assertTrue((public / "empty").is_dir())
+            for src in static.rglob("*.bin"):
+                dest = public / src.relative_to(static)
+                self.assertEqual(src.read_bytes(), dest.read_bytes())
+                self.assertEqual(src.stat().st_mtime_ns, dest.stat().st_mtime_ns)
+
+    def test_link_mode_hardlinks_static_files(self):
+        with tempfile.TemporaryDirectory() as td:
+            static, public = self._write_static(Path(td))
+            copy_static(str(static), str(public), link=True)
+
+            self.assertTrue((public / "index.css").samefile(static / "index.css"))
+
+            # a later copy must replace the link rather than write through it
+            copy_static(str(static), str(public))
+            (public / "index.css").write_text("changed", encoding="utf-8")
+            self.assertEqual(
+                (static / "index.css").read_text(encoding="utf-8"), "body {}"
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
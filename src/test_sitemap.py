@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from unittest import mock
+
+import main
+import sitemap
+from main import generate_pages_recursive
+from sitemap import PageEntry, page_url, write_sitemaps
+
+BASE = "https://example.com"
+SM = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+class TestSitemap(unittest.TestCase):
+    def test_page_url(self):
+        public = Path("public")
+        self.assertEqual(page_url(BASE, public, public / "index.html"), f"{BASE}/")
+        self.assertEqual(
+            page_url(BASE + "/", public, public / "blog" / "index.html"),
+            f"{BASE}/blog/",
+        )
+        self.assertEqual(
+            page_url(BASE, public, public / "a b.html"), f"{BASE}/a%20b.html"
+        )
+
+    def test_large_sites_get_sharded_index(self):
+        with tempfile.TemporaryDirectory() as td:
+            public = Path(td)
+            pages = [PageEntry(f"{BASE}/p{i}.html", f"P{i}", 1000 + i) for i in range(5)]
+            with mock.patch.object(sitemap, "SITEMAP_LIMIT", 2):
+                written = write_sitemaps(public, BASE, pages)
+
+            self.assertEqual(
+                [path.name for path in written],
+                ["sitemap.xml", "sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml"],
+            )
+            index = ET.parse(public / "sitemap.xml").getroot()
+            self.assertEqual(index.tag, f"{SM}sitemapindex")
+            self.assertEqual(
+                [loc.text for loc in index.iter(f"{SM}loc")],
+                [f"{BASE}/sitemap-{n}.xml" for n in (1, 2, 3)],
+            )
+            shard = ET.parse(public / "sitemap-3.xml").getroot()
+            self.assertEqual(
+                [loc.text for loc in shard.iter(f"{SM}loc")], [f"{BASE}/p4.html"]
+            )
+
+            # shrinking back under the limit removes the shards
+            write_sitemaps(public, BASE, pages[:2])
+            self.assertEqual(sorted(p.name for p in public.iterdir()), ["sitemap.xml"])
+
+
+class TestSitemapBuild(unittest.TestCase):
+    def _write_site(self, root: Path) -> tuple[Path, Path, Path]:
+        content = root / "content"
+        (content / "blog").mkdir(parents=True)
+        (content / "index.md").write_text("# Home & Away\n\nHi", encoding="utf-8")
+        (content / "blog" / "index.md").write_text("# Blog\n\nPosts", encoding="utf-8")
+        (content / "blog" / "post.md").write_text("# Post\n\nBody", encoding="utf-8")
+        for i, name in enumerate(["index.md", "blog/index.md", "blog/post.md"]):
+            os.utime(content / name, (1_700_000_000 + i, 1_700_000_000 + i))
+        template = root / "template.html"
+        template.write_text("<title>{{ Title }}</title>{{ Content }}", encoding="utf-8")
+        return content, template, root / "public"
+
+    def _urls(self, public: Path) -> list[str | None]:
+        root = ET.parse(public / "sitemap.xml").getroot()
+        return [loc.text for loc in root.iter(f"{SM}loc")]
+
+    def test_build_writes_sitemap_and_feed(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            generate_pages_recursive(content, template, public, jobs=2, base_url=BASE)
+
+            self.assertEqual(
+                self._urls(public),
+                [f"{BASE}/", f"{BASE}/blog/", f"{BASE}/blog/post.html"],
+            )
+            feed = ET.parse(public / "feed.xml").getroot()
+            self.assertEqual(feed.findtext(f"{ATOM}title"), "Home & Away")
+            self.assertEqual(
+                [e.findtext(f"{ATOM}title") for e in feed.iter(f"{ATOM}entry")],
+                ["Post", "Blog", "Home & Away"],
+            )
+            self.assertEqual(
+                feed.findtext(f"{ATOM}updated"), "2023-11-14T22:13:22+00:00"
+            )
+
+    def test_incremental_build_keeps_skipped_pages_without_reading_them(self):
+        with tempfile.TemporaryDirectory() as td:
+            content, template, public = self._write_site(Path(td))
+            generate_pages_recursive(
+                content, template, public, incremental=True, base_url=BASE
+            )
+            (content / "blog" / "post.md").unlink()
+            (content / "new.md").write_text("# New\n\nFresh", encoding="utf-8")
+
+            extract_title = mock.patch.object(main, "extract_title")
+            with extract_title as extract:
+                summary = generate_pages_recursive(
+                    content, template, public, incremental=True, base_url=BASE
+                )
+
+            extract.assert_not_called()
+            self.assertEqual(summary.skipped, 2)
+            self.assertEqual(
+                self._urls(public), [f"{BASE}/", f"{BASE}/blog/", f"{BASE}/new.html"]
+            )
+            feed = (public / "feed.xml").read_text(encoding="utf-8")
+            self.assertIn("<title>Blog</title>", feed)
+            self.assertNotIn("<title>Post</title>", feed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import io
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import (
+    PAGE_SLOTS,
+    Template,
+    TemplateError,
+    compile_page_template,
+    compile_template,
+)
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_splits_segments_and_slots(self):
+        template = compile_template("<title>{{ Title }}</title>{{Content}}!")
+        self.assertEqual(
+            template, Template(["<title>", "</title>", "!"], ["Title", "Content"])
+        )
+
+    def test_compile_without_placeholders(self):
+        template = compile_template("<p>static</p>")
+        self.assertEqual(template, Template(["<p>static</p>"], []))
+
+    def test_any_placeholder_becomes_a_slot(self):
+        template = compile_template("<html>\n<p>{{ Author }}</p>{{ Content }}")
+        self.assertEqual(template.slots, ["Author", "Content"])
+        buf = io.StringIO()
+        template.fill(Author="Tolkien").render(buf, {"Content": "x"})
+        self.assertEqual(buf.getvalue(), "<html>\n<p>Tolkien</p>x")
+
+        with self.assertRaises(TemplateError) as ctx:
+            template.render(io.StringIO(), {"Content": "x"})
+        self.assertIn("Author", str(ctx.exception))
+
+    def test_unknown_placeholder_fails_at_compile_time(self):
+        with self.assertRaises(TemplateError) as ctx:
+            compile_template("<html>\n<p>{{ Author }}</p>", known=PAGE_SLOTS)
+        self.assertIn("line 2", str(ctx.exception))
+
+    def test_page_template_knows_filled_and_per_page_names(self):
+        source = "<p>{{ Author }}</p>{{ Title }}{{ Content }}"
+        template = compile_page_template(source, Author="Tolkien")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        with self.assertRaises(TemplateError) as ctx:
+            compile_page_template(source)
+        self.assertIn("{{ Author }}", str(ctx.exception))
+
+    def test_render_streams_nodes_and_strings(self):
+        template = compile_template("<h1>{{ Title }}</h1>{{ Content }}")
+        buf = io.StringIO()
+        template.render(
+            buf,
+            {"Title": "Home", "Content": ParentNode("p", [LeafNode("b", "bold")])},
+        )
+        self.assertEqual(buf.getvalue(), "<h1>Home</h1><p><b>bold</b></p>")
+
+    def test_render_repeated_placeholder(self):
+        template = compile_template("{{ Title }}|{{ Title }}")
+        buf = io.StringIO()
+        template.render(buf, {"Title": "A"})
+        self.assertEqual(buf.getvalue(), "A|A")
+
+    def test_render_missing_value(self):
+        template = compile_template("{{ Title }}")
+        with self.assertRaises(TemplateError):
+            template.render(io.StringIO(), {})
+
+    def test_fill_folds_values_into_segments(self):
+        template = compile_template("<p>{{ BuildTime }}</p>{{ Content }}")
+        filled = template.fill(BuildTime="2024-01-01")
+        self.assertEqual(filled, Template(["<p>2024-01-01</p>", ""], ["Content"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -32,6 +32,15 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.ITALIC)
         self.assertNotEqual(node, node2)
 
+    def test_repr(self):
+        node = TextNode("This is a link", TextType.LINK, "https://boot.dev")
+        self.assertEqual(repr(node), "TextNode(This is a link, link, https://boot.dev)")
+
+    def test_text_type_compares_to_value(self):
+        node = TextNode("This is a text node", TextType.ITALIC)
+        self.assertEqual(node.text_type, "italic")
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_text(self):
         node = TextNode("This is a text node", TextType.TEXT)
         html_node = text_node_to_html_node(node)
@@ -0,0 +1,81 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import tracing
+from main import generate_pages_recursive
+
+
+class TestTracing(unittest.TestCase):
+    def tearDown(self):
+        tracing.disable()
+
+    def test_span_is_shared_noop_when_disabled(self):
+        self.assertIs(tracing.span("a"), tracing.span("b", path="x"))
+        with tracing.span("a"):
+            pass
+        self.assertEqual(tracing.disable(), [])
+
+    def test_nested_spans_are_recorded(self):
+        tracing.enable()
+        with tracing.span("outer", page="a.md"):
+            with tracing.span("inner"):
+                pass
+        events = tracing.disable()
+
+        self.assertEqual([e["name"] for e in events], ["inner", "outer"])
+        inner, outer = events
+        self.assertEqual(outer["args"], {"page": "a.md"})
+        self.assertEqual(outer["ph"], "X")
+        self.assertGreaterEqual(inner["ts"], outer["ts"])
+        self.assertLessEqual(inner["dur"], outer["dur"])
+
+    def test_slowest(self):
+        events = [
+            {"name": "generate_page", "dur": 1, "args": {"path": "a"}},
+            {"name": "generate_page", "dur": 3, "args": {"path": "b"}},
+            {"name": "read", "dur": 9, "args": {}},
+            {"name": "generate_page", "dur": 2, "args": {"path": "c"}},
+        ]
+        top = tracing.slowest(events, n=2)
+        self.assertEqual([e["args"]["path"] for e in top], ["b", "c"])
+
+    def _build(self, root: Path, jobs: int) -> list[tracing.TraceEvent]:
+        content = root / "content"
+        content.mkdir()
+        for name in ("a", "b", "c"):
+            (content / f"{name}.md").write_text(
+                f"# {name}\n\nSome **text**", encoding="utf-8"
+            )
+        template = root / "template.html"
+        template.write_text("{{ Title }}{{ Content }}", encoding="utf-8")
+
+        tracing.enable()
+        generate_pages_recursive(content, template, root / "public", jobs=jobs)
+        return tracing.disable()
+
+    def test_build_records_stages_per_page(self):
+        with tempfile.TemporaryDirectory() as td:
+            events = self._build(Path(td), jobs=1)
+
+            names = [e["name"] for e in events]
+            self.assertEqual(names.count("generate_page"), 3)
+            self.assertEqual(names.count("parse_document"), 3)
+            self.assertEqual(names.count("generate_pages_recursive"), 1)
+
+            trace_path = Path(td) / "trace.json"
+            tracing.write_chrome_trace(trace_path, events)
+            data = json.loads(trace_path.read_text(encoding="utf-8"))
+            self.assertEqual(len(data["traceEvents"]), len(events))
+
+    def test_parallel_build_collects_worker_spans(self):
+        with tempfile.TemporaryDirectory() as td:
+            events = self._build(Path(td), jobs=2)
+
+            pages = [e for e in events if e["name"] == "generate_page"]
+            self.assertEqual(len(pages), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import contextlib
+import io
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from main import watch
+from watcher import diff, poll, snapshot
+
+
+class TestWatcher(unittest.TestCase):
+    def test_snapshot_diff(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            (root / "sub").mkdir()
+            (root / "a.md").write_text("a", encoding="utf-8")
+            (root / "sub" / "b.md").write_text("b", encoding="utf-8")
+            before = snapshot([root])
+
+            (root / "a.md").write_text("changed", encoding="utf-8")
+            (root / "sub" / "b.md").unlink()
+            (root / "c.md").write_text("c", encoding="utf-8")
+            changes = diff(before, snapshot([root]))
+
+            self.assertEqual(changes.added, [root / "c.md"])
+            self.assertEqual(changes.modified, [root / "a.md"])
+            self.assertEqual(changes.removed, [root / "sub" / "b.md"])
+
+    def test_snapshot_missing_path(self):
+        self.assertEqual(snapshot([Path("/nonexistent/template.html")]), {})
+
+    def test_poll_starts_from_the_initial_snapshot(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            (root / "a.md").write_text("a", encoding="utf-8")
+            initial = snapshot([root])
+            # changed after the snapshot but before polling starts
+            (root / "a.md").write_text("changed", encoding="utf-8")
+
+            stop = threading.Event()
+            _, changes = next(poll([root], 0.01, 0.02, stop, initial))
+            stop.set()
+
+            self.assertEqual(changes.modified, [root / "a.md"])
+
+    def _wait_for(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.02)
+        return False
+
+    def test_watch_rebuilds_changed_pages_and_assets(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            content = root / "content"
+            static = root / "static"
+            public = root / "public"
+            content.mkdir()
+            static.mkdir()
+            (content / "index.md").write_text("# Home\n\nHello", encoding="utf-8")
+            (content / "old.md").write_text("# Old\n\nBye", encoding="utf-8")
+            (static / "index.css").write_text("body {}", encoding="utf-8")
+            template = root / "template.html"
+            template.write_text(
+                "<title>{{ Title }}</title>{{ Content }}", encoding="utf-8"
+            )
+
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=watch,
+                args=(content, template, static, public),
+                kwargs={"interval": 0.02, "debounce": 0.05, "stop": stop},
+            )
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                thread.start()
+                try:
+                    self._exercise_watch(content, static, public)
+                finally:
+                    stop.set()
+                    thread.join()
+            self.assertIn("rebuilt", out.getvalue())
+
+    def _exercise_watch(self, content: Path, static: Path, public: Path) -> None:
+        self.assertTrue(self._wait_for((public / "old.html").exists))
+
+        (content / "index.md").write_text("# Home\n\nEdited", encoding="utf-8")
+        (content / "old.md").unlink()
+        (static / "site.js").write_text("run()", encoding="utf-8")
+
+        self.assertTrue(
+            self._wait_for(
+                lambda: "Edited"
+                in (public / "index.html").read_text(encoding="utf-8")
+            )
+        )
+        self.assertTrue(self._wait_for(lambda: not (public / "old.html").exists()))
+        self.assertTrue(self._wait_for((public / "site.js").exists))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from enum import StrEnum
+from typing import Mapping
 
 from htmlnode import LeafNode
 
@@ -14,9 +15,12 @@ class TextType(StrEnum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str | None = None) -> None:
         self.text = text
-        self.text_type = text_type.value
+        # TextType is a StrEnum, so it compares and formats like its value
+        self.text_type = text_type
         self.url = url
 
     def __eq__(self, other: object) -> bool:
@@ -33,21 +37,26 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
 
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+def text_node_to_html_node(
+    text_node: TextNode, asset_urls: Mapping[str, str] | None = None
+) -> LeafNode:
+    # asset_urls: fingerprinted URLs, "/images/a.png" -> "/images/a.3f2a9c1b.png"
     text = text_node.text
     url = text_node.url if text_node.url else ""
     match text_node.text_type:
-        case "text":
+        case TextType.TEXT:
             return LeafNode(None, text)
-        case "bold":
+        case TextType.BOLD:
             return LeafNode("b", text)
-        case "italic":
+        case TextType.ITALIC:
             return LeafNode("i", text)
-        case "code":
+        case TextType.CODE:
             return LeafNode("code", text)
-        case "link":
+        case TextType.LINK:
             return LeafNode("a", text, {"href": url})
-        case "image":
+        case TextType.IMAGE:
+            if asset_urls:
+                url = asset_urls.get(url, url)
             return LeafNode("img", "", {"src": url, "alt": text})
         case _:
             raise ValueError("Invalid text type")
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Chrome trace-event "complete" events, see the Trace Event Format spec
+TraceEvent = dict[str, Any]
+
+_events: list[TraceEvent] | None = None
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name: str, args: dict[str, Any]) -> None:
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self) -> _Span:
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        end = time.perf_counter_ns()
+        if _events is not None:
+            _events.append(
+                {
+                    "name": self.name,
+                    "ph": "X",
+                    "ts": self.start / 1000,
+                    "dur": (end - self.start) / 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_native_id(),
+                    "args": self.args,
+                }
+            )
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> _NoSpan:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, **args: Any) -> _Span | _NoSpan:
+    # with tracing off this is one global lookup and a shared no-op object
+    if _events is None:
+        return _NO_SPAN
+    return _Span(name, args)
+
+
+def traced(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    def decorator(fn: Callable[P, R]) -> Callable[P, R]:
+        @wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if _events is None:
+                return fn(*args, **kwargs)
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def enable() -> None:
+    global _events
+    if _events is None:
+        _events = []
+
+
+def disable() -> list[TraceEvent]:
+    global _events
+    events, _events = _events or [], None
+    return events
+
+
+def is_enabled() -> bool:
+    return _events is not None
+
+
+def drain() -> list[TraceEvent]:
+    # hand over what this process recorded so far, e.g. from a pool worker
+    if _events is None:
+        return []
+    events = _events[:]
+    _events.clear()
+    return events
+
+
+def record(events: list[TraceEvent]) -> None:
+    if _events is not None:
+        _events.extend(events)
+
+
+def write_chrome_trace(path: str | Path, events: list[TraceEvent]) -> None:
+    Path(path).write_text(
+        json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}),
+        encoding="utf-8",
+    )
+
+
+def slowest(
+    events: list[TraceEvent], name: str = "generate_page", n: int = 10
+) -> list[TraceEvent]:
+    matching = [event for event in events if event["name"] == name]
+    return sorted(matching, key=lambda event: event["dur"], reverse=True)[:n]
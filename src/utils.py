@@ -1,30 +1,188 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
 import os
 import shutil
+from dataclasses import dataclass
+from pathlib import Path
 
+from compress import Precompressor, remove_siblings
+from fastcopy import copy_files, same_filesystem
 from logger import logger
+from manifest import sidecar_path
+from tracing import traced
+
+
+@dataclass
+class CopyStats:
+    copied: int = 0
+    copied_bytes: int = 0
+    skipped: int = 0
+    skipped_bytes: int = 0
+    removed: int = 0
+    removed_bytes: int = 0
 
+    def __str__(self) -> str:
+        return (
+            f"copied {self.copied} ({self.copied_bytes} bytes), "
+            f"skipped {self.skipped} ({self.skipped_bytes} bytes), "
+            f"removed {self.removed} ({self.removed_bytes} bytes)"
+        )
 
-def copy_static(src: str, dest: str) -> None:
+
+@traced("copy_static")
+def copy_static(
+    src: str,
+    dest: str,
+    sync: bool = False,
+    check_hash: bool = False,
+    jobs: int | None = None,
+    link: bool = False,
+    compressor: Precompressor | None = None,
+) -> CopyStats:
     if not os.path.exists(src):
         raise FileNotFoundError(f"{src} does not exist")
     if not os.path.isdir(src):
         raise NotADirectoryError(f"{src} is not a directory")
 
-    if os.path.exists(dest):
+    if not sync and os.path.exists(dest):
         shutil.rmtree(dest)
-    os.mkdir(dest)
+    os.makedirs(dest, exist_ok=True)
+
+    if link and not same_filesystem(src, dest):
+        logger.warning("%s and %s are on different filesystems, copying", src, dest)
+        link = False
+
+    files, dirs = walk_tree(src)
+    for rel in dirs:
+        os.makedirs(os.path.join(dest, rel), exist_ok=True)
+
+    if sync:
+        stats, to_copy = _plan_sync(src, dest, files, check_hash)
+    else:
+        stats = CopyStats()
+        to_copy = [
+            (os.path.join(src, rel), os.path.join(dest, rel), st.st_size)
+            for rel, st in files.items()
+        ]
+
+    copy_files(to_copy, jobs, link)
+    stats.copied = len(to_copy)
+    stats.copied_bytes = sum(size for _, _, size in to_copy)
+    # one record per file adds up at 100k files; only build them when asked
+    if logger.isEnabledFor(logging.DEBUG):
+        for src_path, dest_path, _ in to_copy:
+            logger.debug("copied: %s -> %s", src_path, dest_path)
+
+    if compressor is not None:
+        # skipped files too, in case their siblings are missing or stale
+        for rel in files:
+            compressor.add(Path(dest, rel))
+    else:
+        for _, dest_path, _ in to_copy:
+            remove_siblings(Path(dest_path))
+
+    # remember what we put there so a later sync can remove stale files
+    state_path = sidecar_path(Path(dest), "static")
+    state_path.write_text(json.dumps(sorted(files)), encoding="utf-8")
+
+    logger.info("static files: %s", stats)
+    return stats
 
-    _copy_dir_recursive(src, dest)
 
+def walk_tree(
+    src_dir: str, rel_dir: str = ""
+) -> tuple[dict[str, os.stat_result], list[str]]:
+    # scandir hands back the file type with the name, so each file costs
+    # a single stat call; the file list is built up front so copies can
+    # run in parallel
+    files: dict[str, os.stat_result] = {}
+    dirs: list[str] = []
+    with os.scandir(src_dir) as entries:
+        for entry in entries:
+            rel = f"{rel_dir}{entry.name}"
+            if entry.is_dir():
+                dirs.append(rel)
+                sub_files, sub_dirs = walk_tree(entry.path, rel + "/")
+                files.update(sub_files)
+                dirs.extend(sub_dirs)
+            else:
+                files[rel] = entry.stat()
+    return files, dirs
 
-def _copy_dir_recursive(src_dir: str, dest_dir: str) -> None:
-    for name in os.listdir(src_dir):
-        src_path = os.path.join(src_dir, name)
-        dest_path = os.path.join(dest_dir, name)
 
-        if os.path.isfile(src_path):
-            shutil.copy(src_path, dest_path)
-            logger.info("copied: %s -> %s", src_path, dest_path)
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _is_unchanged(
+    src_path: str, src_stat: os.stat_result, dest_path: str, check_hash: bool
+) -> bool:
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    if check_hash and file_hash(src_path) == file_hash(dest_path):
+        # align the mtime so the next sync can skip the hash
+        os.utime(dest_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        return True
+    return False
+
+
+def _plan_sync(
+    src: str, dest: str, files: dict[str, os.stat_result], check_hash: bool
+) -> tuple[CopyStats, list[tuple[str, str, int]]]:
+    # only remove files a previous copy put there, so generated pages in the
+    # same directory survive
+    try:
+        previous = set(
+            json.loads(sidecar_path(Path(dest), "static").read_text(encoding="utf-8"))
+        )
+    except (FileNotFoundError, ValueError):
+        previous = set()
+
+    stats = CopyStats()
+    to_copy: list[tuple[str, str, int]] = []
+    for rel, src_stat in files.items():
+        src_path = os.path.join(src, rel)
+        dest_path = os.path.join(dest, rel)
+
+        if _is_unchanged(src_path, src_stat, dest_path, check_hash):
+            stats.skipped += 1
+            stats.skipped_bytes += src_stat.st_size
         else:
-            os.mkdir(dest_path)
-            _copy_dir_recursive(src_path, dest_path)
+            to_copy.append((src_path, dest_path, src_stat.st_size))
+
+    for rel in sorted(previous - files.keys()):
+        dest_path = os.path.join(dest, rel)
+        try:
+            size = os.stat(dest_path).st_size
+            os.remove(dest_path)
+        except FileNotFoundError:
+            continue
+        remove_siblings(Path(dest_path))
+        stats.removed += 1
+        stats.removed_bytes += size
+        logger.debug("removed: %s", dest_path)
+        _remove_empty_parents(dest, os.path.dirname(dest_path))
+
+    return stats, to_copy
+
+
+def _remove_empty_parents(root: str, directory: str) -> None:
+    root = os.path.abspath(root)
+    directory = os.path.abspath(directory)
+    while directory != root and directory.startswith(root):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
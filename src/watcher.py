@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# path -> (mtime_ns, size)
+Snapshot = dict[str, tuple[int, int]]
+
+
+@dataclass
+class Changes:
+    added: list[Path] = field(default_factory=list)
+    modified: list[Path] = field(default_factory=list)
+    removed: list[Path] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+
+def _scan(directory: str, snap: Snapshot) -> None:
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                _scan(entry.path, snap)
+            else:
+                st = entry.stat()
+                snap[entry.path] = (st.st_mtime_ns, st.st_size)
+
+
+def snapshot(paths: Iterable[Path]) -> Snapshot:
+    snap: Snapshot = {}
+    for path in paths:
+        try:
+            if path.is_dir():
+                _scan(str(path), snap)
+            else:
+                st = path.stat()
+                snap[str(path)] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            # a watched path may be mid-replace by an editor
+            continue
+    return snap
+
+
+def diff(old: Snapshot, new: Snapshot) -> Changes:
+    changes = Changes()
+    for path, stamp in new.items():
+        previous = old.get(path)
+        if previous is None:
+            changes.added.append(Path(path))
+        elif previous != stamp:
+            changes.modified.append(Path(path))
+    changes.removed = [Path(path) for path in old.keys() - new.keys()]
+    return changes
+
+
+def poll(
+    paths: list[Path],
+    interval: float = 0.5,
+    debounce: float = 0.2,
+    stop: threading.Event | None = None,
+    initial: Snapshot | None = None,
+) -> Iterator[tuple[float, Changes]]:
+    # yields (monotonic time the change was first seen, changes) once the
+    # tree has been quiet for `debounce` seconds; changes are against
+    # `initial` when given, e.g. taken before a build so edits made while
+    # it ran aren't missed
+    stop = stop or threading.Event()
+    current = snapshot(paths) if initial is None else initial
+    while not stop.wait(interval):
+        latest = snapshot(paths)
+        if latest == current:
+            continue
+
+        first_seen = last_change = time.monotonic()
+        while time.monotonic() - last_change < debounce:
+            if stop.wait(interval):
+                return
+            settled = snapshot(paths)
+            if settled != latest:
+                latest = settled
+                last_change = time.monotonic()
+
+        changes = diff(current, latest)
+        current = latest
+        if changes:
+            yield first_seen, changes